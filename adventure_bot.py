@@ -7,22 +7,38 @@ Supports collaborative storytelling where multiple users can participate in the
 """
 
 import argparse
+import heapq
 import json
 import logging
 import os
 import re
+import sys
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from threading import Lock
-from typing import Dict, List, Optional, Set
+from threading import Lock, local
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Set, Tuple
 
 import requests
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from requests.adapters import HTTPAdapter
 from werkzeug.exceptions import BadRequest
 
-from meshcore import MeshCoreMessage
+from meshcore import _MAX_VALID_CHANNEL_IDX, MeshCoreMessage
+
+try:
+    from waitress import serve as _waitress_serve
+except ImportError:
+    _waitress_serve = None  # type: ignore[assignment]
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 # =============================================================================
 # CONSTANTS
@@ -31,7 +47,10 @@ from meshcore import MeshCoreMessage
 MAX_MSG_LEN = 230
 SESSION_EXPIRY_SECONDS = 3600  # 1 hour
 INACTIVITY_RESET_SECONDS = 86400  # 24 hours
+MAX_HISTORY_ENTRIES = 20  # LLM scenes kept per session (older ones are dropped)
 SESSION_FILE = Path("adventure_sessions.json")
+MAX_MESSAGE_BATCH = 32  # Most messages accepted in one POST /api/messages
+MESSAGE_BATCH_WORKERS = 8  # Sessions from one batch handled at the same time
 
 VALID_THEMES = [
     "fantasy",
@@ -285,12 +304,86 @@ for theme in VALID_THEMES:
     if theme not in FALLBACK_STORIES:
         FALLBACK_STORIES[theme] = _FANTASY_STORY
 
-_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+
+def _render_story(text: str, choices: List[str]) -> str:
+    """Format a story message with lettered choices."""
+    if not choices:
+        return text
+
+    choice_text = " ".join([f"{chr(65+i)}:{c}" for i, c in enumerate(choices)])
+    return f"{text}\n{choice_text}"
+
+
+# Fallback nodes resolved once at import: theme -> node -> (message text,
+# is terminal). Themes sharing a tree share the dict too, so the fallback
+# path (i.e. an LLM outage) does no string building or scanning per message.
+_rendered_trees: Dict[int, Dict[str, Tuple[str, bool]]] = {}
+_FALLBACK_NODES: Dict[str, Dict[str, Tuple[str, bool]]] = {
+    theme: _rendered_trees.setdefault(
+        id(tree),
+        {
+            node: (_render_story(data["text"], data["choices"]), not data["choices"] or "THE END" in data["text"])
+            for node, data in tree.items()
+        },
+    )
+    for theme, tree in FALLBACK_STORIES.items()
+}
+del _rendered_trees
+
+# Story choice letters accepted in chat, either case, mapped to the canonical letter
+_CHOICE_LETTERS = {letter: letter.upper() for letter in "ABCabc"}
+
+# Ollama prompt templates
+_OPENING_PROMPT = (
+    "You are a {theme} adventure game master. "
+    "Start a new adventure. Describe the opening scene and give 3 choices labeled A, B, C."
+)
+_CONTINUE_PROMPT = (
+    "You are a {theme} adventure game master. "
+    "The player chose option {choice}. Continue the story. "
+    "Previous: {previous}. "
+    "Provide 3 new choices labeled A, B, C, or end with 'THE END'."
+)
+
+# Numbered web-interface choices -> story choice letters
+_WEB_CHOICES = {"1": "A", "2": "B", "3": "C"}
+
+# Sentinel for "key absent" when diffing session updates (None is a valid value)
+_MISSING = object()
+
+# Session keys for the valid LoRa channel indexes, built once. Interned (as
+# are keys loaded from disk) so dict lookups match on identity, without a
+# string compare.
+_CHANNEL_KEYS = tuple(sys.intern(f"channel_{i}") for i in range(_MAX_VALID_CHANNEL_IDX + 1))
+
+# What _view_session returns for an unknown session key
+_EMPTY_SESSION: Mapping = MappingProxyType({})
+
+# Static /api/health bodies keyed by distributed_mode (a fresh Response is
+# still built per request, since Werkzeug mutates response headers)
+_HEALTH_BODIES = {
+    True: json.dumps({"status": "healthy", "mode": "distributed"}).encode(),
+    False: json.dumps({"status": "healthy", "mode": "http"}).encode(),
+}
+
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
 
 
 def _is_valid_uuid(value: str) -> bool:
     """Return True if *value* is a valid UUID string (case-insensitive)."""
-    return bool(_UUID_RE.match(value))
+    # fullmatch: '$' in a match() pattern would also accept a trailing newline.
+    # Non-strings (e.g. a numeric session_id in JSON) are rejected, not raised.
+    return isinstance(value, str) and _UUID_RE.fullmatch(value) is not None
+
+
+class _OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for the API request/response path."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 
 # =============================================================================
@@ -319,6 +412,15 @@ class AdventureBot:
         self.debug = debug
         self.ollama_url = ollama_url
         self.model = model
+        # Fixed parts of every /api/generate request, built once
+        self._ollama_generate_url = f"{ollama_url}/api/generate"
+        self._ollama_payload = {"model": model, "stream": False}
+        # Per-thread HTTP sessions (see _http) keep the Ollama socket alive
+        # between story turns instead of reconnecting on every call
+        self._tls = local()
+        # Runs the sessions of one /api/messages batch side by side, as the
+        # same messages would run on separate server threads
+        self._batch_executor = ThreadPoolExecutor(max_workers=MESSAGE_BATCH_WORKERS, thread_name_prefix="batch")
         self.http_host = http_host
         self.http_port = http_port
         self.distributed_mode = distributed_mode
@@ -326,9 +428,31 @@ class AdventureBot:
 
         self._sessions: Dict[str, Dict] = {}
         self._session_lock = Lock()
+        # Serialises disk writes so file I/O never runs under _session_lock
+        self._save_lock = Lock()
+        # Min-heap of (last_active, session_key) so expiry only inspects
+        # sessions that might be stale. Entries go stale when a session is
+        # updated or cleared and are discarded lazily when popped.
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # Set by mutating paths; _save_sessions skips the write when clear
+        self._sessions_dirty = False
         self._last_story_activity = time.time()
         self._quit_votes: Dict[str, Set[str]] = {}
         self._vote_threshold: int = 3
+        # Exact message text -> handler. Every handler takes
+        # (message, session_key, arg), arg being the stripped message text.
+        self._commands = {
+            "!help": self._cmd_help,
+            "help": self._cmd_help,
+            "!adv": self._cmd_start,
+            "!start": self._cmd_start,
+            "!quit": self._cmd_quit,
+            "!end": self._cmd_quit,
+            "!vote": self._cmd_vote,
+            "!status": self._cmd_status,
+            "!reset": self._cmd_reset,
+        }
+        self._commands.update(dict.fromkeys(_CHOICE_LETTERS, self._cmd_choice))
 
         # Set up logging first
         if self.debug:
@@ -343,6 +467,8 @@ class AdventureBot:
 
         # Set up Flask app for HTTP mode
         self.app = Flask(__name__)
+        if orjson is not None:
+            self.app.json = _OrjsonProvider(self.app)
 
         # Enable CORS for web interface
         if os.getenv("WEB_INTERFACE_ENABLED", "true").lower() == "true":
@@ -363,18 +489,26 @@ class AdventureBot:
             except BadRequest as e:
                 return jsonify({"error": f"Failed to parse JSON: {str(e)}"}), 400
 
-            msg = MeshCoreMessage(
-                sender=data.get("sender", "user"),
-                content=data.get("content", ""),
-                channel_idx=data.get("channel_idx", 1),
-            )
-            response = self.handle_message(msg)
+            response = self.handle_message(self._message_from_json(data))
             return jsonify({"response": response})
 
+        @self.app.route("/api/messages", methods=["POST"])
+        def messages_endpoint():
+            """Batched /api/message: one request, responses aligned with the input list."""
+            try:
+                data = request.get_json(silent=False)
+            except BadRequest as e:
+                return jsonify({"error": f"Failed to parse JSON: {str(e)}"}), 400
+            messages = data.get("messages") if isinstance(data, dict) else None
+            if not isinstance(messages, list) or not all(isinstance(m, dict) for m in messages):
+                return jsonify({"error": 'Body must be {"messages": [ {...}, ... ]}'}), 400
+            if len(messages) > MAX_MESSAGE_BATCH:
+                return jsonify({"error": f"At most {MAX_MESSAGE_BATCH} messages per batch"}), 400
+            return jsonify({"responses": self._handle_batch([self._message_from_json(m) for m in messages])})
+
         @self.app.route("/api/health", methods=["GET"])
         def health():
-            mode = "distributed" if self.distributed_mode else "http"
-            return jsonify({"status": "healthy", "mode": mode})
+            return Response(_HEALTH_BODIES[bool(self.distributed_mode)], mimetype="application/json")
 
         @self.app.route("/api/themes", methods=["GET"])
         def themes():
@@ -408,8 +542,8 @@ class AdventureBot:
             self._last_story_activity = time.time()
 
             story_text = self._generate_story(session_key, None, theme)
-            session = self._get_session(session_key)
-            choices = self._get_current_choices(session_key, theme)
+            session = self._view_session(session_key)
+            choices = self._get_current_choices(session, theme)
             status = session.get("status", "active")
 
             return jsonify(
@@ -429,26 +563,28 @@ class AdventureBot:
                 return jsonify({"error": f"Failed to parse JSON: {str(e)}"}), 400
 
             raw_id = data.get("session_id", "")
-            choice = str(data.get("choice", ""))
 
             if not raw_id or not _is_valid_uuid(raw_id):
                 return jsonify({"error": "Invalid or missing session_id (must be UUID)"}), 400
 
-            if choice not in ("1", "2", "3"):
+            # Web clients send 1/2/3; map straight to the story's A/B/C keys
+            choice = _WEB_CHOICES.get(str(data.get("choice", "")))
+            if choice is None:
                 return jsonify({"error": "Choice must be 1, 2, or 3"}), 400
 
             session_key = self._session_key_web(raw_id)
-            session = self._get_session(session_key)
+            session = self._view_session(session_key)
             if not session or session.get("status") != "active":
                 return jsonify({"error": "No active adventure for this session"}), 404
 
             theme = session.get("theme", "fantasy")
             self._last_story_activity = time.time()
 
+            # The view is live and _update_session mutates the session dict in
+            # place, so it already reflects what _generate_story wrote
             story_text = self._generate_story(session_key, choice, theme)
-            session = self._get_session(session_key)
             status = session.get("status", "active")
-            choices = self._get_current_choices(session_key, theme) if status == "active" else []
+            choices = self._get_current_choices(session, theme) if status == "active" else []
 
             if status == "finished":
                 self._clear_session(session_key)
@@ -462,7 +598,7 @@ class AdventureBot:
                 return jsonify({"error": "Invalid or missing session_id (must be UUID)"}), 400
 
             session_key = self._session_key_web(raw_id)
-            session = self._get_session(session_key)
+            session = self._view_session(session_key)
             if not session:
                 return jsonify({"status": "none", "theme": None, "history_length": 0})
 
@@ -489,13 +625,50 @@ class AdventureBot:
             self._clear_session(session_key)
             return jsonify({"message": "Adventure ended", "status": "quit"})
 
-    def _session_key(self, message: MeshCoreMessage) -> str:
+    @staticmethod
+    def _message_from_json(data: Dict) -> MeshCoreMessage:
+        """Build a MeshCoreMessage from an /api/message(s) JSON object."""
+        return MeshCoreMessage(
+            sender=data.get("sender", "user"),
+            content=data.get("content", ""),
+            channel_idx=data.get("channel_idx", 1),
+        )
+
+    def _handle_batch(self, messages: List[MeshCoreMessage]) -> List[Optional[str]]:
+        """
+        Handle a batch of messages, returning the responses in input order.
+
+        Messages for the same session are handled in order, one after
+        another; different sessions are handled concurrently, so a quick
+        command is not held up behind another channel's story turn.
+        """
+        by_session: Dict[str, List[int]] = {}
+        for i, message in enumerate(messages):
+            by_session.setdefault(self._session_key(message), []).append(i)
+        responses: List[Optional[str]] = [None] * len(messages)
+
+        def handle_session(indices: List[int]) -> None:
+            for i in indices:
+                responses[i] = self.handle_message(messages[i])
+
+        if len(by_session) == 1:
+            handle_session(next(iter(by_session.values())))
+        else:
+            for future in [self._batch_executor.submit(handle_session, idx) for idx in by_session.values()]:
+                future.result()
+        return responses
+
+    @staticmethod
+    def _session_key(message: MeshCoreMessage) -> str:
         """
         Generate session key based on channel.
 
         In collaborative mode, all users on the same channel share the same story.
         """
-        return f"channel_{message.channel_idx}"
+        idx = message.channel_idx
+        if type(idx) is int and 0 <= idx <= _MAX_VALID_CHANNEL_IDX:
+            return _CHANNEL_KEYS[idx]
+        return f"channel_{idx}"
 
     def _session_key_web(self, session_id: str) -> str:
         """Generate session key for web users."""
@@ -505,9 +678,9 @@ class AdventureBot:
         """Check if session is from web interface."""
         return session_key.startswith("web_")
 
-    def _get_current_choices(self, session_key: str, theme: str) -> List[str]:
-        """Return the list of available choices for the current story node."""
-        session = self._get_session(session_key)
+    @staticmethod
+    def _get_current_choices(session: Mapping, theme: str) -> List[str]:
+        """Return the list of available choices for the session's current story node."""
         current_node = session.get("node", "start")
         story_tree = FALLBACK_STORIES.get(theme, _FANTASY_STORY)
         node_data = story_tree.get(current_node, {})
@@ -521,16 +694,33 @@ class AdventureBot:
 
     def _get_session(self, session_key: str) -> Dict:
         """Get session data for a session key."""
-        with self._session_lock:
-            return self._sessions.get(session_key, {}).copy()
+        # Lock-free read: dict.get and dict.copy are each a single C call and
+        # atomic under the GIL, so the copy is never a torn snapshot. Writers
+        # still lock for their read-modify-write. A free-threaded (PEP 703)
+        # build would need this read to take the lock again.
+        session = self._sessions.get(session_key)
+        return {} if session is None else session.copy()
+
+    def _view_session(self, session_key: str) -> Mapping:
+        """Read-only live view of a session, for internal callers that only read it."""
+        session = self._sessions.get(session_key)
+        return _EMPTY_SESSION if session is None else MappingProxyType(session)
 
     def _update_session(self, session_key: str, data: Dict):
         """Update session data, merging with existing data."""
         with self._session_lock:
-            if session_key not in self._sessions:
-                self._sessions[session_key] = {}
-            self._sessions[session_key].update(data)
-            self._sessions[session_key]["last_active"] = time.time()
+            session = self._sessions.get(session_key)
+            if session is None:
+                session = self._sessions[session_key] = {}
+                self._sessions_dirty = True
+            elif not self._sessions_dirty:
+                self._sessions_dirty = any(session.get(k, _MISSING) != v for k, v in data.items())
+            session.update(data)
+            now = time.time()
+            session["last_active"] = now
+            heapq.heappush(self._expiry_heap, (now, session_key))
+            if len(self._expiry_heap) > 4 * len(self._sessions) + 64:
+                self._rebuild_expiry_heap()
         self._save_sessions()
 
     def _clear_session(self, session_key: str):
@@ -538,51 +728,88 @@ class AdventureBot:
         with self._session_lock:
             if session_key in self._sessions:
                 del self._sessions[session_key]
+                self._sessions_dirty = True
             self._quit_votes.pop(session_key, None)
         self._save_sessions()
 
+    def _rebuild_expiry_heap(self):
+        """Rebuild the expiry heap from the live sessions (e.g. after loading from disk)."""
+        self._expiry_heap = [(session.get("last_active", 0), key) for key, session in self._sessions.items()]
+        heapq.heapify(self._expiry_heap)
+
     def _expire_sessions(self):
         """Remove expired sessions."""
-        now = time.time()
+        cutoff = time.time() - SESSION_EXPIRY_SECONDS
+        # Common case on every message: nothing is due, so skip the lock.
+        # IndexError covers another thread draining the heap mid-check.
+        try:
+            if self._expiry_heap[0][0] >= cutoff:
+                return
+        except IndexError:
+            return
         with self._session_lock:
-            expired = [
-                key
-                for key, session in self._sessions.items()
-                if now - session.get("last_active", 0) > SESSION_EXPIRY_SECONDS
-            ]
+            heap = self._expiry_heap
+            sessions = self._sessions
+            expired = set()
+            while heap and heap[0][0] < cutoff:
+                _, key = heapq.heappop(heap)
+                session = sessions.get(key)
+                # Stale entry: session was cleared or refreshed since it was pushed
+                if session is None or session.get("last_active", 0) >= cutoff:
+                    continue
+                expired.add(key)
+            if not expired:
+                return
+            if len(expired) > len(sessions) // 2:
+                # Mass expiry: a fresh dict is cheaper than many deletes and
+                # leaves no dummy slots behind to lengthen later lookups
+                self._sessions = {k: v for k, v in sessions.items() if k not in expired}
+            else:
+                for key in expired:
+                    del sessions[key]
             for key in expired:
-                del self._sessions[key]
                 self._quit_votes.pop(key, None)
                 self.logger.info(f"Expired session: {key}")
+            self._sessions_dirty = True
 
     def _save_sessions(self, force: bool = False):
-        """Save sessions to disk (batched to reduce I/O)."""
-        if force or len(self._sessions) > 0:
+        """Save sessions to disk, skipping the write when nothing has changed."""
+        if not (force or self._sessions_dirty):
+            return
+        with self._save_lock:
+            # Only the snapshot is taken under the session lock; readers and
+            # writers are not blocked while the file is written.
             with self._session_lock:
                 try:
-                    with open(SESSION_FILE, "w") as f:
-                        json.dump(self._sessions, f)
-                except (OSError, json.JSONEncodeError) as e:
+                    # One C-encoded dumps + a single write is much cheaper than
+                    # json.dump's chunked writes; compact separators shrink the file
+                    payload = json.dumps(self._sessions, separators=(",", ":"))
+                except (TypeError, ValueError) as e:
                     self.logger.error(f"Failed to save sessions: {e}")
+                    return
+                self._sessions_dirty = False
+            try:
+                with open(SESSION_FILE, "w") as f:
+                    f.write(payload)
+            except OSError as e:
+                self._sessions_dirty = True
+                self.logger.error(f"Failed to save sessions: {e}")
 
     def _load_sessions(self):
         """Load sessions from disk."""
         if SESSION_FILE.exists():
             try:
                 with open(SESSION_FILE, "r") as f:
-                    self._sessions = json.load(f)
+                    self._sessions = {sys.intern(k): v for k, v in json.load(f).items()}
+                self._rebuild_expiry_heap()
                 self.logger.info(f"Loaded {len(self._sessions)} sessions")
-            except (OSError, json.JSONDecodeError, ValueError) as e:
+            except (OSError, ValueError, AttributeError) as e:
                 self.logger.error(f"Failed to load sessions: {e}")
                 self._sessions = {}
 
     def _format_story_message(self, text: str, choices: List[str]) -> str:
         """Format a story message with lettered choices."""
-        if not choices:
-            return text
-
-        choice_text = " ".join([f"{chr(65+i)}:{c}" for i, c in enumerate(choices)])
-        return f"{text}\n{choice_text}"
+        return _render_story(text, choices)
 
     def _get_fallback_story(self, session_key: str, choice: Optional[str], theme: str) -> str:
         """
@@ -590,7 +817,7 @@ class AdventureBot:
 
         Returns formatted story text with choices.
         """
-        session = self._get_session(session_key)
+        session = self._view_session(session_key)
         current_node = session.get("node", "start")
 
         # Get the story tree for this theme
@@ -610,18 +837,30 @@ class AdventureBot:
         if current_node not in story_tree:
             current_node = "start"
 
-        node_data = story_tree[current_node]
-        text = node_data["text"]
-        choices_list = node_data["choices"]
+        message, finished = _FALLBACK_NODES.get(theme, _FALLBACK_NODES["fantasy"])[current_node]
 
-        # Update session with new node
-        self._update_session(session_key, {"node": current_node})
+        # Update session with new node, finishing on a terminal node (THE END)
+        updates = {"node": current_node}
+        if finished:
+            updates["status"] = "finished"
+        self._update_session(session_key, updates)
 
-        # Check if this is a terminal node (THE END)
-        if not choices_list or "THE END" in text:
-            self._update_session(session_key, {"status": "finished"})
+        return message
 
-        return self._format_story_message(text, choices_list)
+    @property
+    def _http(self) -> requests.Session:
+        """
+        This thread's pooled HTTP session.
+
+        Each server worker thread gets its own session, so concurrent story
+        turns never contend on one shared connection pool.
+        """
+        session = getattr(self._tls, "http", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0))
+            self._tls.http = session
+        return session
 
     def _call_ollama(self, session_key: str, choice: Optional[str], theme: str) -> Optional[str]:
         """
@@ -629,23 +868,18 @@ class AdventureBot:
 
         Returns None if Ollama is unavailable or fails.
         """
-        session = self._get_session(session_key)
-        history = session.get("history", [])
-
-        # Build prompt
-        prompt = f"You are a {theme} adventure game master. "
+        history = self._view_session(session_key).get("history")
 
+        # Build prompt: one format call on a prebuilt template
         if not history:
-            prompt += "Start a new adventure. Describe the opening scene and give 3 choices labeled A, B, C."
+            prompt = _OPENING_PROMPT.format(theme=theme)
         else:
-            prompt += f"The player chose option {choice}. Continue the story. "
-            prompt += f"Previous: {history[-1] if history else ''}. "
-            prompt += "Provide 3 new choices labeled A, B, C, or end with 'THE END'."
+            prompt = _CONTINUE_PROMPT.format(theme=theme, choice=choice, previous=history[-1])
 
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={"model": self.model, "prompt": prompt, "stream": False},
+            response = self._http.post(
+                self._ollama_generate_url,
+                json={**self._ollama_payload, "prompt": prompt},
                 timeout=10,
             )
             if response.status_code == 200:
@@ -669,9 +903,11 @@ class AdventureBot:
                 self._update_session(session_key, {"status": "finished"})
 
             # Update history
-            session = self._get_session(session_key)
-            history = session.get("history", [])
-            history.append(llm_result)
+            # Build a new, bounded list: appending in place would mutate the
+            # stored session behind the lock and hide the change from dirty
+            # tracking. A plain list (not a deque) stays JSON-serializable.
+            history = self._view_session(session_key).get("history", [])
+            history = history[-(MAX_HISTORY_ENTRIES - 1) :] + [llm_result]
             self._update_session(session_key, {"history": history})
 
             return llm_result
@@ -699,108 +935,124 @@ class AdventureBot:
         # Expire old sessions periodically
         self._expire_sessions()
 
-        # Help command
-        if content in ["!help", "help"]:
-            themes_list = ", ".join(VALID_THEMES[:5]) + "..."
-            return (
-                f"MCADV Adventure Bot Commands:\n"
-                f"!adv [theme] - Start adventure (default: fantasy)\n"
-                f"!start [theme] - Start adventure\n"
-                f"A/B/C - Make a choice\n"
-                f"!quit - End adventure [ADMIN ONLY]\n"
-                f"!vote - Vote to end adventure (3 votes needed)\n"
-                f"!status - Check status\n"
-                f"Themes: {themes_list}"
-            )
+        # Exact-match commands and A/B/C choices: one dict lookup instead of
+        # a chain of compares
+        handler = self._commands.get(content)
+        if handler is not None:
+            return handler(message, session_key, content)
 
-        # Start adventure (!adv or !start)
-        if content.startswith("!adv") or content.startswith("!start"):
-            parts = content.split(maxsplit=1)
-            theme = parts[1] if len(parts) > 1 else "fantasy"
+        # Start adventure with a theme (!adv or !start followed by the theme)
+        if content.startswith(("!adv", "!start")):
+            return self._cmd_start(message, session_key, content)
 
-            # Validate theme
-            if theme not in VALID_THEMES:
-                theme = "fantasy"
+        # Unknown message - no response
+        return None
 
-            # Clear existing session and start new one
-            self._clear_session(session_key)
-            self._update_session(
-                session_key,
-                {"status": "active", "theme": theme, "node": "start", "history": []},
-            )
+    def _cmd_help(self, message: MeshCoreMessage, session_key: str, arg: str) -> str:
+        """!help / help: list commands and a few themes."""
+        themes_list = ", ".join(VALID_THEMES[:5]) + "..."
+        return (
+            f"MCADV Adventure Bot Commands:\n"
+            f"!adv [theme] - Start adventure (default: fantasy)\n"
+            f"!start [theme] - Start adventure\n"
+            f"A/B/C - Make a choice\n"
+            f"!quit - End adventure [ADMIN ONLY]\n"
+            f"!vote - Vote to end adventure (3 votes needed)\n"
+            f"!status - Check status\n"
+            f"Themes: {themes_list}"
+        )
+
+    def _cmd_start(self, message: MeshCoreMessage, session_key: str, arg: str) -> str:
+        """!adv / !start [theme]: start a new adventure on the channel."""
+        parts = arg.split(maxsplit=1)
+        theme = parts[1] if len(parts) > 1 else "fantasy"
+
+        # Validate theme
+        if theme not in VALID_THEMES:
+            theme = "fantasy"
+
+        # Clear existing session and start new one
+        self._clear_session(session_key)
+        self._update_session(
+            session_key,
+            {"status": "active", "theme": theme, "node": "start", "history": []},
+        )
+
+        # Update activity timestamp
+        self._last_story_activity = time.time()
 
-            # Update activity timestamp
-            self._last_story_activity = time.time()
+        # Generate opening
+        return self._generate_story(session_key, None, theme)
 
-            # Generate opening
-            return self._generate_story(session_key, None, theme)
+    def _cmd_quit(self, message: MeshCoreMessage, session_key: str, arg: str) -> str:
+        """!quit / !end: admin-only immediate end of the adventure."""
+        if self._is_admin(message.sender):
+            self._clear_session(session_key)
+            return "🛑 Admin ended adventure. Type !adv to start new."
+        return "⛔ Only admins can use !quit. Use !vote to vote for ending."
+
+    def _cmd_vote(self, message: MeshCoreMessage, session_key: str, arg: str) -> str:
+        """!vote: register a vote to end the adventure."""
+        session = self._view_session(session_key)
+        if not session or session.get("status") != "active":
+            return "⛔ No active adventure to vote on."
+        with self._session_lock:
+            if session_key not in self._quit_votes:
+                self._quit_votes[session_key] = set()
+            self._quit_votes[session_key].add(message.sender)
+            vote_count = len(self._quit_votes[session_key])
+        if vote_count >= self._vote_threshold:
+            self._clear_session(session_key)
+            return "🗳️ Vote threshold reached! Adventure ended. Type !adv to start new."
+        return f"🗳️ Voted to end adventure ({vote_count}/{self._vote_threshold} votes needed)"
+
+    def _cmd_status(self, message: MeshCoreMessage, session_key: str, arg: str) -> str:
+        """!status: report the channel's adventure status."""
+        session = self._view_session(session_key)
+        if session:
+            theme = session.get("theme", "unknown")
+            status = session.get("status", "unknown")
+            return f"Status: {status}, Theme: {theme}"
+        return "No active adventure. Type !adv to start."
+
+    def _cmd_reset(self, message: MeshCoreMessage, session_key: str, arg: str) -> None:
+        """!reset (user-invoked): silently ignored."""
+        return None
 
-        # Quit/end command
-        if content in ["!quit", "!end"]:
-            if self._is_admin(message.sender):
-                self._clear_session(session_key)
-                return "🛑 Admin ended adventure. Type !adv to start new."
-            return "⛔ Only admins can use !quit. Use !vote to vote for ending."
+    def _cmd_choice(self, message: MeshCoreMessage, session_key: str, arg: str) -> str:
+        """A/B/C (either case): advance the story with the given choice."""
+        choice = _CHOICE_LETTERS[arg]
+        session = self._view_session(session_key)
 
-        # Vote to end command
-        if content == "!vote":
-            session = self._get_session(session_key)
-            if not session or session.get("status") != "active":
-                return "⛔ No active adventure to vote on."
-            with self._session_lock:
-                if session_key not in self._quit_votes:
-                    self._quit_votes[session_key] = set()
-                self._quit_votes[session_key].add(message.sender)
-                vote_count = len(self._quit_votes[session_key])
-            if vote_count >= self._vote_threshold:
-                self._clear_session(session_key)
-                return "🗳️ Vote threshold reached! Adventure ended. Type !adv to start new."
-            return f"🗳️ Voted to end adventure ({vote_count}/{self._vote_threshold} votes needed)"
-
-        # Status command
-        if content == "!status":
-            session = self._get_session(session_key)
-            if session:
-                theme = session.get("theme", "unknown")
-                status = session.get("status", "unknown")
-                return f"Status: {status}, Theme: {theme}"
+        if not session or session.get("status") != "active":
             return "No active adventure. Type !adv to start."
 
-        # Reset command (user-invoked) - silently ignored
-        if content == "!reset":
-            return None
-
-        # Check for letter choice (A/B/C, case-insensitive)
-        if content.upper() in ["A", "B", "C"]:
-            choice = content.upper()
-            session = self._get_session(session_key)
-
-            if not session or session.get("status") != "active":
-                return "No active adventure. Type !adv to start."
-
-            theme = session.get("theme", "fantasy")
+        theme = session.get("theme", "fantasy")
 
-            # Update activity timestamp
-            self._last_story_activity = time.time()
-
-            # Generate next part of story
-            result = self._generate_story(session_key, choice, theme)
+        # Update activity timestamp
+        self._last_story_activity = time.time()
 
-            # Check if adventure finished
-            if self._get_session(session_key).get("status") == "finished":
-                self._clear_session(session_key)
+        # Generate next part of story
+        result = self._generate_story(session_key, choice, theme)
 
-            return result
+        # Check if adventure finished
+        if self._view_session(session_key).get("status") == "finished":
+            self._clear_session(session_key)
 
-        # Unknown message - no response
-        return None
+        return result
 
     def run_http_server(self) -> None:
         """Run the bot as an HTTP server."""
         if self.distributed_mode:
             self.logger.info("Running in distributed mode (HTTP only, no direct radio connection)")
         self.logger.info(f"Starting HTTP server on {self.http_host}:{self.http_port}")
-        self.app.run(host=self.http_host, port=self.http_port)
+        if _waitress_serve is not None:
+            # Production WSGI server: a bounded thread pool handles gateway
+            # requests concurrently while earlier ones wait on Ollama
+            _waitress_serve(self.app, host=self.http_host, port=self.http_port, threads=8, connection_limit=256)
+        else:
+            self.logger.info("waitress not installed; using Flask's built-in threaded server")
+            self.app.run(host=self.http_host, port=self.http_port, threaded=True)
 
 
 # =============================================================================
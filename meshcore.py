@@ -7,12 +7,18 @@ This module provides the core functionality for communicating via MeshCore mesh
 import html
 import json
 import os
+import struct
 import threading
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Union
 
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib parser
+    orjson = None  # type: ignore[assignment]
+
 from logging_config import get_meshcore_logger
 
 # MeshCore companion radio binary protocol constants (USB/serial framing)
@@ -33,6 +39,11 @@ _RESP_NO_MORE_MSGS = 10  # Response: message queue is empty
 _RESP_CONTACT_MSG_V3 = 16  # V3 variant of contact message (includes SNR)
 _RESP_CHANNEL_MSG_V3 = 17  # V3 variant of channel message (includes SNR)
 _MAX_FRAME_SIZE = 300  # Maximum valid frame payload size in bytes
+# Inbound frame header (start byte + uint16_LE payload length)
+_FRAME_HEADER = struct.Struct("<BH")
+# Frame header + CMD_SEND_CHANNEL_TXT_MSG header: code, txt_type, channel_idx, uint32_LE timestamp
+_CHAN_MSG_FRAME_HEADER = struct.Struct("<BHBBBI")
+_CHAN_MSG_CMD_HEADER_SIZE = _CHAN_MSG_FRAME_HEADER.size - _FRAME_HEADER.size
 
 # Channel message format constants
 _OLD_FORMAT_HEADER_SIZE = 8  # code(1) + channel_idx(1) + path_len(1) + txt_type(1) + timestamp(4)
@@ -56,6 +67,13 @@ except ImportError:
         pass
 
 
+# Shared encoder for message JSON; skips json.dumps' per-call argument checks
+_MESSAGE_ENCODER = json.JSONEncoder(separators=(",", ":"))
+# Incoming LoRa lines are parsed with orjson when it is installed; its
+# JSONDecodeError subclasses json.JSONDecodeError so callers are unchanged
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
 class MeshCoreMessage:
     """Represents a message in the MeshCore network"""
 
@@ -80,34 +98,36 @@ class MeshCoreMessage:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dictionary"""
+        channel, channel_idx = self.channel, self.channel_idx
         data = {"sender": self.sender, "content": self.content, "type": self.message_type, "timestamp": self.timestamp}
-        if self.channel:
-            data["channel"] = self.channel
-        if self.channel_idx is not None:
-            data["channel_idx"] = self.channel_idx
+        if channel:
+            data["channel"] = channel
+        if channel_idx is not None:
+            data["channel_idx"] = channel_idx
         return data
 
     def to_json(self) -> str:
         """Convert message to JSON string"""
-        return json.dumps(self.to_dict())
+        return _MESSAGE_ENCODER.encode(self.to_dict())
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "MeshCoreMessage":
         """Create message from dictionary"""
+        get = data.get
         return cls(
-            sender=data.get("sender", "unknown"),
-            content=data.get("content", ""),
-            message_type=data.get("type", "text"),
-            timestamp=data.get("timestamp"),
-            channel=data.get("channel"),
-            channel_idx=data.get("channel_idx"),
+            sender=get("sender", "unknown"),
+            content=get("content", ""),
+            message_type=get("type", "text"),
+            timestamp=get("timestamp"),
+            channel=get("channel"),
+            channel_idx=get("channel_idx"),
         )
 
     @classmethod
     def from_json(cls, json_str: str) -> "MeshCoreMessage":
         """Create message from JSON string"""
         try:
-            data = json.loads(json_str)
+            data = _json_loads(json_str)
             return cls.from_dict(data)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON string: {e}") from e
@@ -139,7 +159,7 @@ def normalize_channel_name(channel: Optional[str], warn: bool = True) -> Optiona
     if channel is None:
         return None
 
-    if channel.startswith("#"):
+    if channel[:1] == "#":
         normalized = channel[1:]  # Remove the hash
         if warn:
             print(f"⚠ Warning: Channel name '{channel}' includes hash (#) prefix.")
@@ -376,10 +396,46 @@ class MeshCore:
         Returns:
             MeshCoreMessage object
         """
-        message = MeshCoreMessage(
-            sender=self.node_id, content=content, message_type=message_type, channel=channel, channel_idx=channel_idx
-        )
+        actual_channel_idx = self._mark_channel_active(channel, channel_idx)
+        return self._transmit(content, message_type, channel, channel_idx, actual_channel_idx)
+
+    def send_message_batch(
+        self,
+        contents: List[str],
+        message_type: str = "text",
+        channel: Optional[str] = None,
+        channel_idx: Optional[int] = None,
+        interval: float = 0.0,
+    ) -> List[MeshCoreMessage]:
+        """
+        Send several messages, in order, to the same channel.
+
+        Equivalent to calling send_message for each entry, except that the
+        channel lookup and the active-channel bookkeeping (including the
+        channels.json write) happen once for the whole batch.
 
+        Args:
+            contents: Message contents, sent in order
+            message_type: Type of message
+            channel: Optional channel name to broadcast to
+            channel_idx: Optional raw channel index (0-7); see send_message
+            interval: Seconds to wait between consecutive messages (LoRa pacing)
+
+        Returns:
+            List of MeshCoreMessage objects, one per entry
+        """
+        if not contents:
+            return []
+        actual_channel_idx = self._mark_channel_active(channel, channel_idx)
+        messages = []
+        for i, content in enumerate(contents):
+            if i and interval > 0:
+                time.sleep(interval)
+            messages.append(self._transmit(content, message_type, channel, channel_idx, actual_channel_idx))
+        return messages
+
+    def _mark_channel_active(self, channel: Optional[str], channel_idx: Optional[int]) -> int:
+        """Resolve the channel_idx to send on and record it as active."""
         # Determine which channel_idx to use:
         # 1. If channel_idx is explicitly provided, use it directly (for replies)
         # 2. Otherwise, map the channel name to a channel_idx
@@ -392,6 +448,20 @@ class MeshCore:
         with self._channel_lock:
             self._active_channels[actual_channel_idx] = time.time()
         self.save_active_channels()
+        return actual_channel_idx
+
+    def _transmit(
+        self,
+        content: str,
+        message_type: str,
+        channel: Optional[str],
+        channel_idx: Optional[int],
+        actual_channel_idx: int,
+    ) -> MeshCoreMessage:
+        """Log and transmit one message on an already-resolved channel_idx."""
+        message = MeshCoreMessage(
+            sender=self.node_id, content=content, message_type=message_type, channel=channel, channel_idx=channel_idx
+        )
 
         channel_info = f" on channel '{channel}'" if channel else ""
         if channel_idx is not None:
@@ -403,9 +473,19 @@ class MeshCore:
             # CMD_SEND_CHANNEL_TXT_MSG: code(1) + txt_type(1) + channel_idx(1)
             #                           + timestamp uint32_LE(4) + text
             try:
-                ts_bytes = int(time.time()).to_bytes(4, "little")
-                cmd_data = bytes([_CMD_SEND_CHAN_MSG, 0, actual_channel_idx]) + ts_bytes + content.encode("utf-8")
-                frame = bytes([_FRAME_IN]) + len(cmd_data).to_bytes(2, "little") + cmd_data
+                text = content.encode("utf-8")
+                frame = bytearray(_CHAN_MSG_FRAME_HEADER.size + len(text))
+                _CHAN_MSG_FRAME_HEADER.pack_into(
+                    frame,
+                    0,
+                    _FRAME_IN,
+                    _CHAN_MSG_CMD_HEADER_SIZE + len(text),
+                    _CMD_SEND_CHAN_MSG,
+                    0,
+                    actual_channel_idx,
+                    int(time.time()) & 0xFFFFFFFF,
+                )
+                frame[_CHAN_MSG_FRAME_HEADER.size :] = text
                 self._serial.write(frame)
                 self.log(f"LoRa TX channel msg (idx={actual_channel_idx}): {content}")
                 # After sending, sync to allow the companion radio to process and respond
@@ -668,7 +748,9 @@ class MeshCore:
         Inbound frame format (app→radio):  0x3C + uint16_LE(len) + payload
         """
         if self._serial and self._serial.is_open:
-            frame = bytes([_FRAME_IN]) + len(cmd_data).to_bytes(2, "little") + cmd_data
+            frame = bytearray(_FRAME_HEADER.size + len(cmd_data))
+            _FRAME_HEADER.pack_into(frame, 0, _FRAME_IN, len(cmd_data))
+            frame[_FRAME_HEADER.size :] = cmd_data
             try:
                 self._serial.write(frame)
                 self.log(f"LoRa CMD: {cmd_data.hex()}")
@@ -24,18 +24,112 @@ import os
 import sys
 import threading
 import time
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, Union
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     from requests.exceptions import RequestException
 except ImportError:
     print("Error: requests module not found. Install with: pip install requests")
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:  # optional: requests' stdlib encoding is used instead
+    orjson = None  # type: ignore[assignment]
+
 from logging_config import get_meshcore_logger, log_startup_info
 from meshcore import MeshCore, MeshCoreMessage
 
+# Worker threads forwarding messages to the bot server. The LoRa listener
+# only queues work, so a slow bot/LLM reply on one channel does not stop
+# the radio from being read or other channels from being served.
+FORWARD_WORKERS = 4
+
+# Opportunistic batching: messages that arrive while a POST is being
+# prepared share one request to /api/messages instead of one each
+MAX_BATCH_SIZE = 32
+BATCH_DELAY_SECONDS = 0.005
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Separator the bot server places between parts of a multi-part response
+_PART_SEPARATOR = "\n---PART---\n"
+
+
+class _ForwardBatcher:
+    """
+    Coalesce concurrent forwards into batched POSTs.
+
+    The first caller to find no batch collecting becomes its leader: it
+    waits BATCH_DELAY_SECONDS so concurrent messages can join, takes up to
+    MAX_BATCH_SIZE of them, sends them and resolves each caller's Future.
+    A leader only ever sends its own batch. Collection of the next batch is
+    handed over before the POST starts (to the first caller left pending,
+    or to the next one to arrive), so a slow reply never holds up later
+    messages. A lone message goes through send_one, so light traffic uses
+    plain /api/message exactly as before.
+    """
+
+    def __init__(
+        self,
+        send_one: Callable[[MeshCoreMessage], Optional[str]],
+        send_batch: Callable[[List[MeshCoreMessage]], Optional[List[Optional[str]]]],
+    ):
+        self._send_one = send_one
+        self._send_batch = send_batch
+        # (message, future, wake); wake is set when the future resolves or
+        # when the caller is promoted to lead the next batch
+        self._pending: List[Tuple[MeshCoreMessage, Future, threading.Event]] = []
+        self._lock = threading.Lock()
+        self._collecting = False
+        # Cleared when the server has no /api/messages (older bot server)
+        self.batch_supported = True
+
+    def forward(self, message: MeshCoreMessage) -> Optional[str]:
+        future: Future = Future()
+        wake = threading.Event()
+        future.add_done_callback(lambda _: wake.set())
+        with self._lock:
+            self._pending.append((message, future, wake))
+            lead = not self._collecting
+            self._collecting = True
+        while True:
+            if lead:
+                time.sleep(BATCH_DELAY_SECONDS)
+                self._flush()
+            # No timeout needed: every pending caller is either in a batch
+            # whose POST is bounded by the gateway's HTTP timeout, or is
+            # promoted to lead once the batch ahead of it is taken
+            wake.wait()
+            if future.done():
+                return future.result()
+            wake.clear()
+            lead = True
+
+    def _flush(self) -> None:
+        with self._lock:
+            batch = self._pending[:MAX_BATCH_SIZE]
+            del self._pending[:MAX_BATCH_SIZE]
+            if self._pending:
+                self._pending[0][2].set()
+            else:
+                self._collecting = False
+        try:
+            responses = None
+            if len(batch) > 1 and self.batch_supported:
+                responses = self._send_batch([m for m, _, _ in batch])
+            if responses is None:
+                responses = [self._send_one(m) for m, _, _ in batch]
+            for (_, future, _), response in zip(batch, responses):
+                future.set_result(response)
+        except Exception as e:  # never leave a caller waiting on its Future
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+
 
 def _read_version() -> str:
     """Read the project version from the VERSION file at the repository root."""
@@ -85,8 +179,12 @@ class RadioGateway:
         # Logging
         self.logger, self.error_logger = get_meshcore_logger(debug=debug)
 
-        # HTTP session for connection pooling (faster requests)
+        # HTTP session for connection pooling (faster requests), keeping one
+        # kept-alive connection per worker
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FORWARD_WORKERS, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
         # MeshCore handles all LoRa serial I/O
         self.mesh = MeshCore(
@@ -95,7 +193,9 @@ class RadioGateway:
             serial_port=port,
             baud_rate=baud,
         )
-        self.mesh.register_handler("text", self.handle_message)
+        self._batcher = _ForwardBatcher(self._forward_to_bot, self._forward_batch_to_bot)
+        self._executor = ThreadPoolExecutor(max_workers=FORWARD_WORKERS, thread_name_prefix="gw-forward")
+        self.mesh.register_handler("text", self._submit_message)
 
         # Stats for monitoring
         self.stats = {
@@ -104,6 +204,27 @@ class RadioGateway:
             "messages_failed": 0,
             "responses_sent": 0,
         }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat: str) -> None:
+        """Increment a stats counter (called from several forwarding threads)."""
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _submit_message(self, message: MeshCoreMessage) -> None:
+        """MeshCore handler: hand the message to a forwarding worker and return."""
+        if self.allowed_channel_idx is not None and message.channel_idx != self.allowed_channel_idx:
+            # Other channels are only counted and dropped; no worker handoff needed
+            self.handle_message(message)
+            return
+        self._executor.submit(self.handle_message, message).add_done_callback(self._report_worker_error)
+
+    def _report_worker_error(self, future: Future) -> None:
+        """Done-callback for forwarding workers: log and count errors handle_message let through."""
+        if future.cancelled() or future.exception() is None:
+            return
+        self._count("messages_failed")
+        self.error_logger.error("Unhandled error forwarding message", exc_info=future.exception())
 
     def handle_message(self, message: MeshCoreMessage) -> None:
         """
@@ -111,7 +232,7 @@ class RadioGateway:
 
         Forwards the message to the bot server and sends the response back via LoRa.
         """
-        self.stats["messages_received"] += 1
+        self._count("messages_received")
 
         # Filter by channel if configured
         if self.allowed_channel_idx is not None:
@@ -129,20 +250,20 @@ class RadioGateway:
         self.logger.info(f"[{sender}@ch{channel_idx}] {content}")
 
         try:
-            # Forward message to bot server
-            response_text = self._forward_to_bot(message)
+            # Forward message to bot server (batched with any concurrent messages)
+            response_text = self._batcher.forward(message)
 
             if response_text:
-                self.stats["messages_forwarded"] += 1
+                self._count("messages_forwarded")
                 # Send response back via LoRa
                 self._send_response(response_text, channel_idx)
-                self.stats["responses_sent"] += 1
+                self._count("responses_sent")
             else:
-                self.stats["messages_failed"] += 1
+                self._count("messages_failed")
                 self.logger.warning(f"No response from bot server for message from {sender}")
 
         except (ConnectionError, TimeoutError, ValueError) as e:
-            self.stats["messages_failed"] += 1
+            self._count("messages_failed")
             self.error_logger.exception(f"Error handling message from {sender}")
             self.logger.error(f"Error handling message: {e}")
 
@@ -153,20 +274,11 @@ class RadioGateway:
         Returns the bot's response text, or None if the request failed.
         """
         url = f"{self.bot_server_url}/api/message"
-        payload = {
-            "sender": message.sender,
-            "content": message.content,
-            "channel_idx": message.channel_idx if message.channel_idx is not None else 0,
-            "timestamp": message.timestamp,
-        }
+        payload = self._message_payload(message)
 
         try:
             self.logger.debug(f"Forwarding to bot server: {url}")
-            response = self.session.post(
-                url,
-                json=payload,
-                timeout=self.timeout,
-            )
+            response = self._post_json(url, payload)
             response.raise_for_status()
 
             data = response.json()
@@ -181,6 +293,61 @@ class RadioGateway:
             self.logger.error(f"Invalid response from bot server: {e}")
             return None
 
+    def _post_json(
+        self, url: str, payload: dict, timeout: Optional[Union[float, Tuple[float, float]]] = None
+    ) -> "requests.Response":
+        """POST *payload* as JSON, encoding it with orjson when available."""
+        if timeout is None:
+            timeout = self.timeout
+        if orjson is None:
+            return self.session.post(url, json=payload, timeout=timeout)
+        return self.session.post(url, data=orjson.dumps(payload), headers=_JSON_HEADERS, timeout=timeout)
+
+    @staticmethod
+    def _message_payload(message: MeshCoreMessage) -> dict:
+        """JSON object describing one message for /api/message(s)."""
+        return {
+            "sender": message.sender,
+            "content": message.content,
+            "channel_idx": message.channel_idx if message.channel_idx is not None else 0,
+            "timestamp": message.timestamp,
+        }
+
+    def _forward_batch_to_bot(self, messages: List[MeshCoreMessage]) -> Optional[List[Optional[str]]]:
+        """
+        Forward several messages in one POST to /api/messages.
+
+        Returns the responses aligned with *messages* (None entries if the
+        request failed), or None if the server has no batch endpoint, in
+        which case callers fall back to one POST each.
+        """
+        url = f"{self.bot_server_url}/api/messages"
+        try:
+            # Messages for one channel are handled one after another on the
+            # server, so allow each message the time it would get on its own
+            response = self._post_json(
+                url,
+                {"messages": [self._message_payload(m) for m in messages]},
+                timeout=(self.timeout, self.timeout * len(messages)),
+            )
+            if response.status_code == 404:
+                self.logger.info("Bot server has no /api/messages; forwarding one message per request")
+                self._batcher.batch_supported = False
+                return None
+            response.raise_for_status()
+            responses = response.json()["responses"]
+            if not isinstance(responses, list) or len(responses) != len(messages):
+                raise ValueError("response count does not match batch size")
+            return responses
+        except RequestException as e:
+            self.error_logger.exception("Batched HTTP request to bot server failed")
+            self.logger.error(f"Failed to contact bot server: {e}")
+            return [None] * len(messages)
+        except (KeyError, TypeError, ValueError) as e:
+            self.error_logger.exception("Invalid batched response from bot server")
+            self.logger.error(f"Invalid batched response from bot server: {e}")
+            return [None] * len(messages)
+
     def _send_response(self, text: str, channel_idx: int) -> None:
         """
         Send a response back to the LoRa network.
@@ -191,14 +358,10 @@ class RadioGateway:
         """
         # Check if response is a multi-part message (indicated by newline-separated parts)
         # The bot server may return multiple messages that need to be sent separately
-        if "\n---PART---\n" in text:
-            # Multi-part response - send each part separately with a small delay
-            parts = text.split("\n---PART---\n")
-            for i, part in enumerate(parts):
-                if part.strip():
-                    self.mesh.send_message(part.strip(), "text", channel_idx=channel_idx)
-                    if i < len(parts) - 1:
-                        time.sleep(0.5)  # Small delay between parts
+        if _PART_SEPARATOR in text:
+            # Multi-part response - send the parts as one batch, with a small delay between them
+            parts = [part for part in map(str.strip, text.split(_PART_SEPARATOR)) if part]
+            self.mesh.send_message_batch(parts, "text", channel_idx=channel_idx, interval=0.5)
         else:
             # Single message
             self.mesh.send_message(text, "text", channel_idx=channel_idx)
@@ -277,6 +440,7 @@ class RadioGateway:
             self.logger.info("Stopping...")
         finally:
             self._running = False
+            self._executor.shutdown(wait=False)
             if hasattr(self, "session"):
                 self.session.close()
             self.mesh.stop()
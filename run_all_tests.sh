@@ -1,4 +1,13 @@
 #!/usr/bin/env bash
 # Run all tests with coverage report.
+# When pytest-xdist is installed the suite is sharded across CPU cores,
+# leaving two cores free (override with PYTEST_XDIST_WORKER_COUNT).
 cd "$(dirname "$0")"
+
+if python -c "import xdist" >/dev/null 2>&1; then
+    workers=$(( $(nproc 2>/dev/null || echo 3) - 2 ))
+    [ "$workers" -lt 1 ] && workers=1
+    set -- -n "${PYTEST_XDIST_WORKER_COUNT:-$workers}" --dist=loadscope "$@"
+fi
+
 python -m pytest tests/ -v --tb=short "$@"
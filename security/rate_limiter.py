@@ -1,5 +1,5 @@
 import time
-from collections import deque
+from array import array
 from threading import Lock
 
 
@@ -9,24 +9,27 @@ class RateLimiter:
     def __init__(self, max_messages: int = 10, window_seconds: int = 60):
         self.max_messages = max_messages
         self.window_seconds = window_seconds
+        # user_id -> [ring buffer of the last max_messages admit times, index of the oldest]
         self._windows: dict = {}
         self._lock = Lock()
 
     def is_allowed(self, user_id: str) -> bool:
         """Return True if the user has not exceeded their rate limit."""
-        now = time.time()
-        cutoff = now - self.window_seconds
+        now = time.monotonic()
         with self._lock:
-            if user_id not in self._windows:
-                self._windows[user_id] = deque()
-            window = self._windows[user_id]
-            # Remove expired timestamps
-            while window and window[0] < cutoff:
-                window.popleft()
-            if len(window) < self.max_messages:
-                window.append(now)
-                return True
-            return False
+            entry = self._windows.get(user_id)
+            if entry is None:
+                if self.max_messages <= 0:
+                    return False
+                entry = self._windows[user_id] = [array("d", [float("-inf")]) * self.max_messages, 0]
+            buf, head = entry
+            # The user is at the limit while their oldest of the last
+            # max_messages admits is still inside the window
+            if buf[head] >= now - self.window_seconds:
+                return False
+            buf[head] = now
+            entry[1] = (head + 1) % len(buf)
+            return True
 
     def reset(self, user_id: str) -> None:
         """Reset the rate-limit window for a specific user."""
@@ -35,11 +38,10 @@ class RateLimiter:
 
     def get_remaining(self, user_id: str) -> int:
         """Return the number of messages the user may still send in the window."""
-        now = time.time()
-        cutoff = now - self.window_seconds
+        cutoff = time.monotonic() - self.window_seconds
         with self._lock:
-            if user_id not in self._windows:
+            entry = self._windows.get(user_id)
+            if entry is None:
                 return self.max_messages
-            window = self._windows[user_id]
-            recent = sum(1 for ts in window if ts >= cutoff)
+            recent = sum(1 for ts in entry[0] if ts >= cutoff)
             return max(0, self.max_messages - recent)
@@ -1,7 +1,11 @@
-import html as html_module
+import re
 
 from security.rate_limiter import RateLimiter
 
+# Same mapping as html.escape(quote=True), applied in one str.translate pass
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+_THEME_DISALLOWED_RE = re.compile(r"[^a-z_]")
+
 
 class InputValidator:
     """Validates and sanitizes user input."""
@@ -15,16 +19,12 @@ class InputValidator:
 
     def validate_message_content(self, content: str) -> str:
         """Truncate, strip null bytes, and HTML-escape message content."""
-        content = content.replace("\x00", "")
-        content = content[: self.MAX_MESSAGE_LENGTH]
-        content = html_module.escape(content)
-        return content
+        return content.replace("\x00", "")[: self.MAX_MESSAGE_LENGTH].translate(_HTML_ESCAPE_TABLE)
 
     def sanitize_theme_name(self, theme: str) -> str:
         """Lowercase, filter to allowed characters, and truncate theme name."""
-        theme = theme.lower()
-        theme = "".join(c for c in theme if c in self.ALLOWED_THEME_CHARS)
-        return theme[: self.MAX_THEME_LENGTH]
+        # _THEME_DISALLOWED_RE is the complement of ALLOWED_THEME_CHARS
+        return _THEME_DISALLOWED_RE.sub("", theme.lower())[: self.MAX_THEME_LENGTH]
 
     def validate_channel_idx(self, idx: int) -> bool:
         """Return True if channel index is in the valid range 0–7."""
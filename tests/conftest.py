@@ -3,16 +3,31 @@ pytest fixtures shared across all test modules.
 """
 
 import os
+import socket
 import sys
 import tempfile
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 
 from adventure_bot import AdventureBot  # noqa: E402
 from meshcore import MeshCoreMessage  # noqa: E402
+from tests.test_utils import stub_llm  # noqa: E402
+
+
+def _network_disabled(*args, **kwargs):
+    raise RuntimeError("network access is disabled in tests; mock the HTTP call instead")
+
+
+@pytest.fixture(autouse=True)
+def _block_network(monkeypatch):
+    """Fail fast on any outbound connection a test forgot to mock."""
+    monkeypatch.setattr(socket.socket, "connect", _network_disabled)
+    monkeypatch.setattr(socket.socket, "connect_ex", _network_disabled)
 
 
 @pytest.fixture()
@@ -27,7 +42,7 @@ def bot():
     )
     instance._sessions = {}
     instance._save_sessions = MagicMock()
-    instance._call_ollama = MagicMock(return_value=None)
+    instance._call_ollama = stub_llm()
     return instance
 
 
@@ -51,7 +66,7 @@ def temp_dir():
 @pytest.fixture()
 def mock_ollama(bot):
     """Patch _call_ollama to always return None (forces fallback stories)."""
-    bot._call_ollama = MagicMock(return_value=None)
+    bot._call_ollama = stub_llm()
     return bot
 
 
@@ -6,64 +6,99 @@ Tests the bot in distributed-only mode where handle_message() returns
 response strings directly (no mesh object).
 """
 
-import os
-import sys
-import tempfile
-import time
+import functools
+import io
+import itertools
+import re
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from adventure_bot import (  # noqa: E402
-    _FANTASY_STORY,
-    _HORROR_STORY,
-    _SCIFI_STORY,
+from adventure_bot import (
     FALLBACK_STORIES,
     INACTIVITY_RESET_SECONDS,
     MAX_MSG_LEN,
     SESSION_EXPIRY_SECONDS,
     VALID_THEMES,
     AdventureBot,
+    _render_story,
 )
-from meshcore import MeshCoreMessage  # noqa: E402
+from meshcore import MeshCoreMessage
+from tests.test_utils import stub_llm
 
 # ---------------------------------------------------------------------------
 # Test helpers
 # ---------------------------------------------------------------------------
 
 
-def make_bot(**kwargs) -> AdventureBot:
+def _no_save(force: bool = False) -> None:
+    """Stand-in for _save_sessions: no disk I/O."""
+
+
+# Constructor defaults shared by every make_bot() call; never mutated
+_MAKE_BOT_DEFAULTS = {
+    "debug": False,
+    "ollama_url": "http://localhost:11434",
+    "model": "test-model",
+    "http_host": "0.0.0.0",
+    "http_port": 5000,
+}
+
+
+def make_bot(stub_llms: bool = True, **kwargs) -> AdventureBot:
     """
     Create an AdventureBot for testing in distributed mode.
 
     The bot runs as an HTTP server and returns responses directly.
-    Sessions are reset to an empty dict and _save_sessions is mocked
+    Sessions are reset to an empty dict and _save_sessions is a no-op
     so no disk I/O happens, preventing state from leaking between tests.
+    With *stub_llms* (the default) the LLM call always returns None so
+    the offline fallback story is used and no network is touched.
     """
-    defaults = dict(
-        debug=False,
-        ollama_url="http://localhost:11434",
-        model="test-model",
-        http_host="0.0.0.0",
-        http_port=5000,
-    )
-    defaults.update(kwargs)
-    bot = AdventureBot(**defaults)
+    bot = AdventureBot(**{**_MAKE_BOT_DEFAULTS, **kwargs})
     # Isolate each test: start with clean in-memory sessions, no disk writes
-    bot._sessions = {}
-    bot._save_sessions = MagicMock()
+    bot._sessions.clear()
+    bot._save_sessions = _no_save
+    if stub_llms:
+        bot._call_ollama = stub_llm()
+    return bot
+
+
+def reset_bot(bot: AdventureBot, stub_llms: bool = True) -> AdventureBot:
+    """
+    Return *bot* restored to the pristine state produced by make_bot().
+
+    Lets a TestCase build one bot in setUpClass and reuse it across tests:
+    per-test state (sessions, votes, patched methods) is wiped in setUp.
+    Pass ``stub_llms=False`` when the TestCase is decorated with a
+    class-level patch of AdventureBot._call_ollama; any per-instance
+    override is then dropped so the class patch shows through.
+    """
+    bot._sessions.clear()
+    bot._quit_votes.clear()
+    bot._save_sessions = _no_save
+    if stub_llms:
+        bot._call_ollama = stub_llm()
+    else:
+        vars(bot).pop("_call_ollama", None)
     return bot
 
 
+_MSG_TIMESTAMP = 1_700_000_000.0
+
+
+@functools.lru_cache(maxsize=64)
 def make_msg(sender: str = "Alice", content: str = "!adv", channel_idx: int = 1) -> MeshCoreMessage:
     """
     Create a MeshCoreMessage for testing.
 
     In collaborative mode, all users on the same channel share the same story.
     The channel_idx determines which story session is used.
+
+    Messages are cached per argument tuple: the bot only reads them, so
+    repeated calls with the same arguments can share one instance.
     """
-    return MeshCoreMessage(sender=sender, content=content, channel_idx=channel_idx)
+    # Positional args with a fixed timestamp: no kwarg parsing, no clock read
+    return MeshCoreMessage(sender, content, "text", _MSG_TIMESTAMP, None, channel_idx)
 
 
 def get_session_key(channel_idx: int = 1) -> str:
@@ -75,20 +110,29 @@ def get_session_key(channel_idx: int = 1) -> str:
     return f"channel_{channel_idx}"
 
 
+# Session keys for the channels the tests actually use, formatted once
+CHANNEL_1 = get_session_key(1)
+CHANNEL_2 = get_session_key(2)
+
+
 # ---------------------------------------------------------------------------
 # Story message formatting
 # ---------------------------------------------------------------------------
 
 
+# One scan for all three lettered choices instead of three assertIn passes
+_THREE_CHOICES_RE = re.compile(r"A:Go in.*B:Turn back.*C:Shout", re.S)
+
+
 class TestFormatStoryMessage(unittest.TestCase):
-    def setUp(self):
-        self.bot = make_bot()
+    @classmethod
+    def setUpClass(cls):
+        # _format_story_message is pure, so one bot serves every test
+        cls.bot = make_bot()
 
     def test_with_three_choices(self):
         msg = self.bot._format_story_message("A dark cave.", ["Go in", "Turn back", "Shout"])
-        self.assertIn("A:Go in", msg)
-        self.assertIn("B:Turn back", msg)
-        self.assertIn("C:Shout", msg)
+        self.assertRegex(msg, _THREE_CHOICES_RE)
 
     def test_terminal_node_returns_text_only(self):
         msg = self.bot._format_story_message("You win. THE END", [])
@@ -105,9 +149,23 @@ class TestFormatStoryMessage(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 
+_FROZEN_NOW = 1_000_000.0
+
+
 class TestSessionManagement(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Deterministic, syscall-free clock: each call advances by one second
+        cls._time_patch = patch("adventure_bot.time.time", side_effect=itertools.count(1_700_000_000.0, 1.0).__next__)
+        cls._time_patch.start()
+        cls._template_bot = make_bot()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._time_patch.stop()
+
     def setUp(self):
-        self.bot = make_bot()
+        self.bot = reset_bot(self._template_bot)
 
     def test_new_session_is_empty(self):
         self.assertEqual(self.bot._get_session("Bob"), {})
@@ -135,14 +193,26 @@ class TestSessionManagement(unittest.TestCase):
         self.bot._clear_session("nobody")  # should not raise
 
     def test_expired_session_removed(self):
-        self.bot._update_session("OldUser", {"status": "active"})
-        self.bot._sessions["OldUser"]["last_active"] = time.time() - SESSION_EXPIRY_SECONDS - 1
-        self.bot._expire_sessions()
+        with patch("adventure_bot.time.time", return_value=_FROZEN_NOW - SESSION_EXPIRY_SECONDS - 1):
+            self.bot._update_session("OldUser", {"status": "active"})
+        with patch("adventure_bot.time.time", return_value=_FROZEN_NOW):
+            self.bot._expire_sessions()
         self.assertEqual(self.bot._get_session("OldUser"), {})
 
+    def test_refreshed_session_not_expired(self):
+        with patch("adventure_bot.time.time", return_value=_FROZEN_NOW - SESSION_EXPIRY_SECONDS - 1):
+            self.bot._update_session("User", {"status": "active"})
+        with patch("adventure_bot.time.time", return_value=_FROZEN_NOW):
+            self.bot._update_session("User", {"node": "forest"})
+            self.bot._expire_sessions()
+        self.assertEqual(self.bot._get_session("User")["node"], "forest")
+
     def test_recent_session_not_expired(self):
-        self.bot._update_session("NewUser", {"status": "active"})
-        self.bot._expire_sessions()
+        with patch("adventure_bot.time.time", return_value=_FROZEN_NOW - SESSION_EXPIRY_SECONDS):
+            self.bot._update_session("NewUser", {"status": "active"})
+        # Exactly at the expiry boundary is still alive (strict ">" check)
+        with patch("adventure_bot.time.time", return_value=_FROZEN_NOW):
+            self.bot._expire_sessions()
         self.assertNotEqual(self.bot._get_session("NewUser"), {})
 
 
@@ -152,25 +222,29 @@ class TestSessionManagement(unittest.TestCase):
 
 
 class TestSessionKey(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # _session_key is a staticmethod: no bot needed
+        cls._key_alice_ch1 = AdventureBot._session_key(make_msg(sender="Alice", channel_idx=1))
+        cls._key_bob_ch1 = AdventureBot._session_key(make_msg(sender="Bob", channel_idx=1))
+        cls._key_alice_ch2 = AdventureBot._session_key(make_msg(sender="Alice", channel_idx=2))
+
     def test_key_is_channel(self):
         """Test that session key is based on channel, not sender (collaborative mode)."""
-        bot = make_bot()
-        msg = make_msg(sender="Alice", channel_idx=1)
-        self.assertEqual(bot._session_key(msg), "channel_1")
+        self.assertEqual(self._key_alice_ch1, "channel_1")
 
     def test_different_users_same_channel_same_key(self):
         """Test that different users on same channel share the same session key."""
-        bot = make_bot()
-        msg1 = make_msg(sender="Alice", channel_idx=1)
-        msg2 = make_msg(sender="Bob", channel_idx=1)
-        self.assertEqual(bot._session_key(msg1), bot._session_key(msg2))
+        self.assertEqual(self._key_alice_ch1, self._key_bob_ch1)
 
     def test_different_channels_different_keys(self):
         """Test that different channels have different session keys."""
-        bot = make_bot()
-        msg1 = make_msg(sender="Alice", channel_idx=1)
-        msg2 = make_msg(sender="Alice", channel_idx=2)
-        self.assertNotEqual(bot._session_key(msg1), bot._session_key(msg2))
+        self.assertNotEqual(self._key_alice_ch1, self._key_alice_ch2)
+
+    def test_out_of_range_channel_keys(self):
+        """Indexes outside the cached 0-7 range still get a channel_<idx> key."""
+        self.assertEqual(AdventureBot._session_key(make_msg(channel_idx=42)), "channel_42")
+        self.assertEqual(AdventureBot._session_key(make_msg(channel_idx=None)), "channel_None")
 
 
 # ---------------------------------------------------------------------------
@@ -178,14 +252,21 @@ class TestSessionKey(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 
+# Story trees are immutable module constants, so format every node once per
+# process with the module-level renderer behind _format_story_message
+_FORMATTED = {
+    theme: {node_id: _render_story(node["text"], node["choices"]) for node_id, node in tree.items()}
+    for theme, tree in FALLBACK_STORIES.items()
+}
+
+
 class TestFallbackStory(unittest.TestCase):
-    def setUp(self):
-        self.bot = make_bot()
+    @classmethod
+    def setUpClass(cls):
+        cls._template_bot = make_bot()
 
-    def test_start_returns_opening_scene(self):
-        result = self.bot._get_fallback_story("Alice", choice=None, theme="fantasy")
-        self.assertIn("crossroads", result)
-        self.assertIn("A:", result)
+    def setUp(self):
+        self.bot = reset_bot(self._template_bot)
 
     def test_choice_1_advances_to_forest(self):
         self.bot._get_fallback_story("Alice", choice=None, theme="fantasy")  # sets node="start"
@@ -198,13 +279,19 @@ class TestFallbackStory(unittest.TestCase):
         self.assertNotIn("A:", result)  # road_pay is terminal
         self.assertEqual(self.bot._get_session("Alice")["status"], "finished")
 
-    def test_scifi_theme_loads_correctly(self):
-        result = self.bot._get_fallback_story("Alice", choice=None, theme="scifi")
-        self.assertIn("colony ship", result.lower())
+    THEME_OPENINGS = [
+        ("fantasy", "crossroads"),
+        ("scifi", "colony ship"),
+        ("horror", "manor"),
+    ]
 
-    def test_horror_theme_loads_correctly(self):
-        result = self.bot._get_fallback_story("Alice", choice=None, theme="horror")
-        self.assertIn("manor", result.lower())
+    def test_theme_openings(self):
+        for theme, keyword in self.THEME_OPENINGS:
+            with self.subTest(theme=theme):
+                self.bot._sessions.clear()
+                result = self.bot._get_fallback_story("Alice", choice=None, theme=theme)
+                self.assertIn(keyword, result.lower())
+                self.assertIn("A:", result)
 
     def test_invalid_choice_resets_to_start(self):
         self.bot._update_session("Alice", {"status": "active", "node": "road", "theme": "fantasy"})
@@ -213,32 +300,12 @@ class TestFallbackStory(unittest.TestCase):
         # Should reset to "start" node
         self.assertIn("crossroads", result)
 
-    def test_all_fantasy_nodes_fit_max_msg_len(self):
-        for node_id, node in _FANTASY_STORY.items():
-            msg = self.bot._format_story_message(node["text"], node["choices"])
-            self.assertLessEqual(
-                len(msg),
-                MAX_MSG_LEN,
-                f"Fantasy node '{node_id}' formatted message exceeds {MAX_MSG_LEN} chars ({len(msg)})",
-            )
-
-    def test_all_scifi_nodes_fit_max_msg_len(self):
-        for node_id, node in _SCIFI_STORY.items():
-            msg = self.bot._format_story_message(node["text"], node["choices"])
-            self.assertLessEqual(
-                len(msg),
-                MAX_MSG_LEN,
-                f"Scifi node '{node_id}' formatted message exceeds {MAX_MSG_LEN} chars ({len(msg)})",
-            )
-
-    def test_all_horror_nodes_fit_max_msg_len(self):
-        for node_id, node in _HORROR_STORY.items():
-            msg = self.bot._format_story_message(node["text"], node["choices"])
-            self.assertLessEqual(
-                len(msg),
-                MAX_MSG_LEN,
-                f"Horror node '{node_id}' formatted message exceeds {MAX_MSG_LEN} chars ({len(msg)})",
-            )
+    def test_all_nodes_fit_max_msg_len(self):
+        for theme, messages in _FORMATTED.items():
+            for node_id, msg in messages.items():
+                if len(msg) > MAX_MSG_LEN:
+                    with self.subTest(theme=theme, node=node_id):
+                        self.fail(f"Node '{node_id}' formatted message exceeds {MAX_MSG_LEN} chars ({len(msg)})")
 
 
 # ---------------------------------------------------------------------------
@@ -246,11 +313,14 @@ class TestFallbackStory(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 
+@patch.object(AdventureBot, "_call_ollama", stub_llm())
 class TestHandleMessage(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._template_bot = make_bot(stub_llms=False)
+
     def setUp(self):
-        self.bot = make_bot()
-        # Always use offline fallback so tests don't need network
-        self.bot._call_ollama = MagicMock(return_value=None)
+        self.bot = reset_bot(self._template_bot, stub_llms=False)
 
     # -- help --
 
@@ -267,32 +337,23 @@ class TestHandleMessage(unittest.TestCase):
 
     # -- !adv start --
 
-    def test_adv_starts_fantasy_by_default(self):
-        reply = self.bot.handle_message(make_msg(content="!adv"))
-        s = self.bot._get_session(get_session_key(1))
-        self.assertEqual(s["theme"], "fantasy")
-        self.assertEqual(s["status"], "active")
-        self.assertIsNotNone(reply)
-
-    def test_adv_with_explicit_theme(self):
-        reply = self.bot.handle_message(make_msg(content="!adv scifi"))
-        self.assertEqual(self.bot._get_session(get_session_key(1))["theme"], "scifi")
-        self.assertIsNotNone(reply)
-
-    def test_adv_with_horror_theme(self):
-        reply = self.bot.handle_message(make_msg(content="!adv horror"))
-        self.assertEqual(self.bot._get_session(get_session_key(1))["theme"], "horror")
-        self.assertIsNotNone(reply)
-
-    def test_adv_unknown_theme_defaults_to_fantasy(self):
-        reply = self.bot.handle_message(make_msg(content="!adv unicorns"))
-        self.assertEqual(self.bot._get_session(get_session_key(1))["theme"], "fantasy")
-        self.assertIsNotNone(reply)
-
-    def test_start_alias(self):
-        reply = self.bot.handle_message(make_msg(content="!start horror"))
-        self.assertEqual(self.bot._get_session(get_session_key(1))["theme"], "horror")
-        self.assertIsNotNone(reply)
+    ADV_CASES = [
+        ("!adv", {"theme": "fantasy", "status": "active"}),
+        ("!adv scifi", {"theme": "scifi"}),
+        ("!adv horror", {"theme": "horror"}),
+        ("!adv unicorns", {"theme": "fantasy"}),
+        ("!start horror", {"theme": "horror"}),
+    ]
+
+    def test_adv_commands(self):
+        for content, expected in self.ADV_CASES:
+            with self.subTest(content=content):
+                self.bot._sessions.clear()
+                reply = self.bot.handle_message(make_msg(content=content))
+                self.assertIsNotNone(reply)
+                s = self.bot._sessions[CHANNEL_1]
+                for field, value in expected.items():
+                    self.assertEqual(s[field], value)
 
     # -- choices --
 
@@ -301,7 +362,7 @@ class TestHandleMessage(unittest.TestCase):
         self.assertIn("!adv", reply)
 
     def test_choice_with_active_session_advances_story(self):
-        key = get_session_key(1)
+        key = CHANNEL_1
         self.bot._update_session(key, {"status": "active", "node": "start", "theme": "fantasy", "history": []})
         reply = self.bot.handle_message(make_msg(content="A"))
         self.assertIsNotNone(reply)
@@ -310,7 +371,7 @@ class TestHandleMessage(unittest.TestCase):
 
     def test_choice_on_terminal_node_clears_session(self):
         # road_pay is terminal; node "road" -> choice "A" -> "road_pay"
-        key = get_session_key(1)
+        key = CHANNEL_1
         self.bot._update_session(key, {"status": "active", "node": "road", "theme": "fantasy", "history": []})
         reply = self.bot.handle_message(make_msg(content="A"))
         self.assertIsNotNone(reply)
@@ -320,7 +381,7 @@ class TestHandleMessage(unittest.TestCase):
     # -- !quit / !reset --
 
     def test_quit_clears_session(self):
-        key = get_session_key(1)
+        key = CHANNEL_1
         self.bot._update_session(key, {"status": "active", "theme": "fantasy"})
         reply = self.bot.handle_message(make_msg(content="!quit"))
         self.assertEqual(self.bot._get_session(key), {})
@@ -331,7 +392,7 @@ class TestHandleMessage(unittest.TestCase):
         self.assertIn("!adv", reply)
 
     def test_end_alias(self):
-        key = get_session_key(1)
+        key = CHANNEL_1
         self.bot._update_session(key, {"status": "active"})
         reply = self.bot.handle_message(make_msg(content="!end"))
         self.assertEqual(self.bot._get_session(key), {})
@@ -344,7 +405,7 @@ class TestHandleMessage(unittest.TestCase):
         self.assertIn("!adv", reply)
 
     def test_status_active_session(self):
-        key = get_session_key(1)
+        key = CHANNEL_1
         self.bot._update_session(key, {"status": "active", "theme": "scifi"})
         reply = self.bot.handle_message(make_msg(content="!status"))
         self.assertIn("scifi", reply)
@@ -377,7 +438,6 @@ class TestAdminControls(unittest.TestCase):
     def setUp(self):
         # Configure bot with a known admin
         self.bot = make_bot(admin_users=["!admin01"])
-        self.bot._call_ollama = MagicMock(return_value=None)
 
     def _start_adventure(self, channel_idx=1):
         key = get_session_key(channel_idx)
@@ -425,7 +485,7 @@ class TestAdminControls(unittest.TestCase):
 
     def test_no_admins_configured_everyone_can_quit(self):
         bot = make_bot()  # admin_users defaults to empty
-        key = get_session_key(1)
+        key = CHANNEL_1
         bot._update_session(key, {"status": "active", "theme": "fantasy"})
         reply = bot.handle_message(make_msg(sender="anyone", content="!quit", channel_idx=1))
         self.assertEqual(bot._get_session(key), {})
@@ -488,13 +548,12 @@ class TestAdminControls(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 
+@patch.object(AdventureBot, "_call_ollama", stub_llm())
 class TestCollaborativeMode(unittest.TestCase):
     """Test collaborative storytelling where multiple users share the same story."""
 
     def setUp(self):
-        self.bot = make_bot()
-        # Always use offline fallback so tests don't need network
-        self.bot._call_ollama = MagicMock(return_value=None)
+        self.bot = make_bot(stub_llms=False)
 
     def test_different_users_same_channel_share_story(self):
         """Test that Alice and Bob on same channel see the same story."""
@@ -507,8 +566,7 @@ class TestCollaborativeMode(unittest.TestCase):
         self.assertIsNotNone(reply2)
 
         # Verify both users share the same session
-        key = get_session_key(1)
-        session = self.bot._get_session(key)
+        session = self.bot._sessions[CHANNEL_1]
         self.assertEqual(session["status"], "active")
         # The node should have advanced from "start" after Bob's choice
         self.assertNotEqual(session.get("node"), "start")
@@ -522,27 +580,25 @@ class TestCollaborativeMode(unittest.TestCase):
         self.bot.handle_message(make_msg(sender="Bob", content="!adv scifi", channel_idx=2))
 
         # Verify they have different sessions
-        key1 = get_session_key(1)
-        key2 = get_session_key(2)
-        session1 = self.bot._get_session(key1)
-        session2 = self.bot._get_session(key2)
+        session1 = self.bot._sessions[CHANNEL_1]
+        session2 = self.bot._sessions[CHANNEL_2]
 
         self.assertEqual(session1["theme"], "fantasy")
         self.assertEqual(session2["theme"], "scifi")
 
     def test_reset_is_blocked_for_users(self):
         """Test that user-invoked !reset is silently ignored."""
-        key = get_session_key(1)
+        key = CHANNEL_1
         self.bot._update_session(key, {"status": "active", "theme": "fantasy"})
 
         reply = self.bot.handle_message(make_msg(sender="Bob", content="!reset", channel_idx=1))
         self.assertIsNone(reply)
         # Session should remain active
-        self.assertEqual(self.bot._get_session(key).get("status"), "active")
+        self.assertEqual(self.bot._sessions[key]["status"], "active")
 
     def test_bot_reset_clears_session(self):
         """Test that _bot_reset() clears all sessions and returns the announcement."""
-        key = get_session_key(1)
+        key = CHANNEL_1
         self.bot._update_session(key, {"status": "active", "theme": "fantasy"})
 
         msg = self.bot._bot_reset()
@@ -550,20 +606,17 @@ class TestCollaborativeMode(unittest.TestCase):
         self.assertIn("Resetting", msg)
         self.assertEqual(self.bot._sessions, {})
 
-    def test_inactivity_last_activity_updated_on_adv(self):
-        """Test that _last_story_activity is updated when !adv starts a story."""
-        before = self.bot._last_story_activity
-        time.sleep(0.01)
-        self.bot.handle_message(make_msg(sender="Alice", content="!adv fantasy", channel_idx=1))
-        self.assertGreater(self.bot._last_story_activity, before)
-
-    def test_inactivity_last_activity_updated_on_choice(self):
-        """Test that _last_story_activity is updated on a valid story choice."""
-        self.bot.handle_message(make_msg(sender="Alice", content="!adv", channel_idx=1))
-        before = self.bot._last_story_activity
-        time.sleep(0.01)
-        self.bot.handle_message(make_msg(sender="Bob", content="A", channel_idx=1))
-        self.assertGreater(self.bot._last_story_activity, before)
+    def test_inactivity_last_activity_updated_on_adv_and_choice(self):
+        """Test that _last_story_activity advances on !adv and again on a valid choice."""
+        # A ticking clock replaces the old sleep(0.01) between steps
+        clock = itertools.count(_FROZEN_NOW, 1.0)
+        before = self.bot._last_story_activity = _FROZEN_NOW - 1.0
+        with patch("adventure_bot.time.time", side_effect=clock.__next__):
+            self.bot.handle_message(make_msg(sender="Alice", content="!adv fantasy", channel_idx=1))
+            after_adv = self.bot._last_story_activity
+            self.bot.handle_message(make_msg(sender="Bob", content="A", channel_idx=1))
+        self.assertGreater(after_adv, before)
+        self.assertGreater(self.bot._last_story_activity, after_adv)
 
     def test_multiple_users_can_make_choices(self):
         """Test that multiple users can make choices in sequence."""
@@ -575,8 +628,7 @@ class TestCollaborativeMode(unittest.TestCase):
         self.assertIsNotNone(reply1)
 
         # Verify session exists and is active, finished, or cleared (if terminal node reached)
-        key = get_session_key(1)
-        session = self.bot._get_session(key)
+        session = self.bot._sessions.get(CHANNEL_1)
         # Session may be cleared if terminal node was reached, otherwise should have status
         if session:
             self.assertIn(session.get("status"), ["active", "finished"])
@@ -588,37 +640,48 @@ class TestCollaborativeMode(unittest.TestCase):
 
 
 class TestLLMIntegration(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._template_bot = make_bot()
+
     def setUp(self):
-        self.bot = make_bot()
-        self.session_key = get_session_key(1)
+        self.bot = reset_bot(self._template_bot)
+        self.session_key = CHANNEL_1
         self.bot._update_session(
             self.session_key, {"status": "active", "node": "start", "theme": "fantasy", "history": []}
         )
 
     def test_llm_response_used_when_available(self):
         llm_text = "You find a chest.\n1:Open it 2:Leave it 3:Kick it"
-        with patch.object(self.bot, "_call_ollama", return_value=llm_text):
-            result = self.bot._generate_story(self.session_key, choice=None, theme="fantasy")
+        self.bot._call_ollama = lambda *args, **kwargs: llm_text
+        result = self.bot._generate_story(self.session_key, choice=None, theme="fantasy")
         self.assertEqual(result, llm_text)
 
     def test_fallback_used_when_ollama_fails(self):
-        with patch.object(self.bot, "_call_ollama", return_value=None):
-            result = self.bot._generate_story(self.session_key, choice=None, theme="fantasy")
+        # reset_bot() already stubs _call_ollama to return None
+        result = self.bot._generate_story(self.session_key, choice=None, theme="fantasy")
         self.assertIn("crossroads", result)
 
     def test_the_end_marks_session_finished(self):
-        with patch.object(self.bot, "_call_ollama", return_value="You won! THE END"):
-            self.bot._generate_story(self.session_key, choice=None, theme="fantasy")
+        self.bot._call_ollama = lambda *args, **kwargs: "You won! THE END"
+        self.bot._generate_story(self.session_key, choice=None, theme="fantasy")
         self.assertEqual(self.bot._get_session(self.session_key)["status"], "finished")
 
     def test_llm_result_returns_full_text(self):
         """_generate_story returns full LLM response text."""
         long_story = "A" * 300
-        with patch.object(self.bot, "_call_ollama", return_value=long_story):
-            result = self.bot._generate_story(self.session_key, choice=None, theme="fantasy")
+        self.bot._call_ollama = lambda *args, **kwargs: long_story
+        result = self.bot._generate_story(self.session_key, choice=None, theme="fantasy")
         # The result from _generate_story is the full text
         self.assertEqual(len(result), 300)
 
+    def test_llm_result_appended_to_history_and_marked_dirty(self):
+        self.bot._call_ollama = lambda *args, **kwargs: "A cave. A:In B:Out C:Wait"
+        self.bot._sessions_dirty = False
+        self.bot._generate_story(self.session_key, choice=None, theme="fantasy")
+        self.assertEqual(self.bot._get_session(self.session_key)["history"], ["A cave. A:In B:Out C:Wait"])
+        self.assertTrue(self.bot._sessions_dirty)
+
 
 # ---------------------------------------------------------------------------
 # Constants / data integrity
@@ -626,33 +689,43 @@ class TestLLMIntegration(unittest.TestCase):
 
 
 class TestConstants(unittest.TestCase):
+    """Integrity checks on the immutable story constants, evaluated once per class."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._missing_themes = [t for t in VALID_THEMES if t not in FALLBACK_STORIES]
+        cls._missing_start = [t for t, tree in FALLBACK_STORIES.items() if "start" not in tree]
+        cls._missing_next = [
+            (theme, node_id, choice, next_id)
+            for theme, tree in FALLBACK_STORIES.items()
+            for node_id, node in tree.items()
+            for choice, next_id in node.get("next", {}).items()
+            if next_id not in tree
+        ]
+        cls._bad_terminals = [
+            (theme, node_id)
+            for theme, tree in FALLBACK_STORIES.items()
+            for node_id, node in tree.items()
+            if not node.get("next") and node["choices"]
+        ]
+
     def test_all_valid_themes_have_story_trees(self):
-        for theme in VALID_THEMES:
-            self.assertIn(theme, FALLBACK_STORIES)
+        self.assertEqual(self._missing_themes, [], "Themes missing a story tree")
 
     def test_all_story_trees_have_start_node(self):
-        for theme, tree in FALLBACK_STORIES.items():
-            self.assertIn("start", tree, f"Theme '{theme}' missing 'start' node")
+        for theme in self._missing_start:
+            with self.subTest(theme=theme):
+                self.fail(f"Theme '{theme}' missing 'start' node")
 
     def test_all_next_nodes_exist(self):
-        for theme, tree in FALLBACK_STORIES.items():
-            for node_id, node in tree.items():
-                for choice, next_id in node.get("next", {}).items():
-                    self.assertIn(
-                        next_id,
-                        tree,
-                        f"Theme '{theme}', node '{node_id}', choice '{choice}' " f"references missing node '{next_id}'",
-                    )
+        for theme, node_id, choice, next_id in self._missing_next:
+            with self.subTest(theme=theme, node=node_id, choice=choice):
+                self.fail(f"Theme '{theme}', node '{node_id}', choice '{choice}' references missing node '{next_id}'")
 
     def test_terminal_nodes_have_no_choices(self):
-        for theme, tree in FALLBACK_STORIES.items():
-            for node_id, node in tree.items():
-                if not node.get("next"):
-                    self.assertEqual(
-                        node["choices"],
-                        [],
-                        f"Theme '{theme}', terminal node '{node_id}' should have empty choices",
-                    )
+        for theme, node_id in self._bad_terminals:
+            with self.subTest(theme=theme, node=node_id):
+                self.fail(f"Theme '{theme}', terminal node '{node_id}' should have empty choices")
 
 
 # ---------------------------------------------------------------------------
@@ -660,30 +733,72 @@ class TestConstants(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 
+class _CapturingStringIO(io.StringIO):
+    """StringIO that hands its final contents to *sink* when closed."""
+
+    def __init__(self, sink):
+        super().__init__()
+        self._sink = sink
+
+    def close(self):
+        self._sink(self.getvalue())
+        super().close()
+
+
+class _MemorySessionFile:
+    """Disk-free stand-in for SESSION_FILE with a matching open()."""
+
+    def __init__(self):
+        self.data = None
+
+    def exists(self) -> bool:
+        return self.data is not None
+
+    def _store(self, text: str) -> None:
+        self.data = text
+
+    def open(self, path, mode="r", *args, **kwargs):
+        if "w" in mode:
+            return _CapturingStringIO(self._store)
+        return io.StringIO(self.data)
+
+
 class TestSessionPersistence(unittest.TestCase):
     def test_sessions_saved_and_reloaded(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            session_path = os.path.join(tmpdir, "sessions.json")
-            import adventure_bot as ab_module
-
-            original_path = ab_module.SESSION_FILE
-            ab_module.SESSION_FILE = type(ab_module.SESSION_FILE)(session_path)
-
-            try:
-                bot = make_bot()
-                # Restore real _save_sessions so data actually hits disk
-                bot._save_sessions = AdventureBot._save_sessions.__get__(bot, AdventureBot)
-                bot._update_session("Alice", {"status": "active", "theme": "scifi"})
-                # Force save to disk (batched saves need explicit flush for testing)
-                bot._save_sessions(force=True)
-
-                # A fresh bot should reload Alice's session from disk
-                bot2 = make_bot()
-                bot2._load_sessions()
-                s = bot2._get_session("Alice")
-                self.assertEqual(s["theme"], "scifi")
-            finally:
-                ab_module.SESSION_FILE = original_path
+        # Round-trip through an in-memory SESSION_FILE: no tempdir, no disk writes.
+        session_file = _MemorySessionFile()
+        with patch("adventure_bot.SESSION_FILE", session_file), patch(
+            "adventure_bot.open", session_file.open, create=True
+        ):
+            bot = make_bot()
+            # Restore real _save_sessions so the JSON is actually serialised
+            bot._save_sessions = AdventureBot._save_sessions.__get__(bot, AdventureBot)
+            bot._update_session("Alice", {"status": "active", "theme": "scifi"})
+            # Force save (batched saves need explicit flush for testing)
+            bot._save_sessions(force=True)
+
+            # A fresh bot should reload Alice's session from the saved JSON
+            bot2 = make_bot()
+            bot2._load_sessions()
+        s = bot2._get_session("Alice")
+        self.assertEqual(s["theme"], "scifi")
+
+    def test_unchanged_sessions_not_rewritten(self):
+        session_file = _MemorySessionFile()
+        with patch("adventure_bot.SESSION_FILE", session_file), patch(
+            "adventure_bot.open", session_file.open, create=True
+        ):
+            bot = make_bot()
+            bot._save_sessions = AdventureBot._save_sessions.__get__(bot, AdventureBot)
+            bot._update_session("Alice", {"status": "active", "theme": "scifi"})
+            self.assertIsNotNone(session_file.data)
+
+            session_file.data = None
+            bot._update_session("Alice", {"theme": "scifi"})  # no change
+            self.assertIsNone(session_file.data)
+
+            bot._update_session("Alice", {"node": "forest"})
+            self.assertIsNotNone(session_file.data)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+"""
+Tests for utils/config.py – dot-notation lookups, file overrides and env overrides.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from utils.config import Config
+
+
+class TestConfigGet(unittest.TestCase):
+    """Test dot-notation access to the configuration."""
+
+    def test_leaf_value(self):
+        self.assertEqual(Config().get("server.port"), 5000)
+
+    def test_missing_key_returns_default(self):
+        self.assertEqual(Config().get("server.nope", "fallback"), "fallback")
+
+    def test_section_returns_dict(self):
+        self.assertEqual(Config().get("server"), {"host": "0.0.0.0", "port": 5000, "debug": False})
+
+    def test_mutating_returned_section_does_not_desync_lookups(self):
+        config = Config()
+        section = config.get("server")
+        section["port"] = 1234
+        self.assertEqual(config.get("server.port"), 5000)
+        self.assertEqual(config.get("server")["port"], 5000)
+
+    def test_instances_do_not_share_defaults(self):
+        first = Config()
+        first._data["server"]["port"] = 1
+        self.assertEqual(Config().get("server.port"), 5000)
+
+
+class TestConfigOverrides(unittest.TestCase):
+    """Test config-file merging and environment-variable overrides."""
+
+    def test_file_merges_nested_sections(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.json")
+            with open(path, "w") as fh:
+                json.dump({"server": {"port": 8080}, "security": {"rate_limit": {"enabled": False}}}, fh)
+            config = Config(path)
+        self.assertEqual(config.get("server.port"), 8080)
+        self.assertEqual(config.get("server.host"), "0.0.0.0")
+        self.assertFalse(config.get("security.rate_limit.enabled"))
+        self.assertEqual(config.get("security.rate_limit.max_messages_per_minute"), 10)
+
+    def test_env_overrides(self):
+        with patch.dict(os.environ, {"OLLAMA_MODEL": "tiny", "BOT_PORT": "9000"}):
+            config = Config.from_env()
+        self.assertEqual(config.get("llm.model"), "tiny")
+        self.assertEqual(config.get("server.port"), "9000")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -4,18 +4,16 @@ End-to-end / integration tests for MCADV.
 All serial and HTTP I/O is mocked so no hardware or running server is required.
 """
 
+import functools
 import json
-import os
-import sys
 import threading
 import time
 import unittest
 from unittest.mock import MagicMock, patch
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from adventure_bot import AdventureBot  # noqa: E402
-from meshcore import MeshCoreMessage  # noqa: E402
+from adventure_bot import MAX_MESSAGE_BATCH, AdventureBot
+from meshcore import MeshCoreMessage
+from tests.test_utils import stub_llm
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -34,11 +32,12 @@ def _make_bot(**kwargs) -> AdventureBot:
     bot = AdventureBot(**defaults)
     bot._sessions = {}
     bot._save_sessions = MagicMock()
-    bot._call_ollama = MagicMock(return_value=None)
     return bot
 
 
+@functools.lru_cache(maxsize=64)
 def _msg(sender="Alice", content="!adv", channel_idx=1) -> MeshCoreMessage:
+    # Messages are only read by the bot, so identical arguments share one instance
     return MeshCoreMessage(sender=sender, content=content, channel_idx=channel_idx)
 
 
@@ -47,6 +46,7 @@ def _msg(sender="Alice", content="!adv", channel_idx=1) -> MeshCoreMessage:
 # =============================================================================
 
 
+@patch.object(AdventureBot, "_call_ollama", stub_llm())
 class TestDistributedMode(unittest.TestCase):
     """Full workflow test: message in → response out, no real network."""
 
@@ -123,6 +123,7 @@ class TestDistributedMode(unittest.TestCase):
 # =============================================================================
 
 
+@patch.object(AdventureBot, "_call_ollama", stub_llm())
 class TestGatewayBotCommunication(unittest.TestCase):
     """Simulate gateway → bot server HTTP communication using Flask test client."""
 
@@ -169,12 +170,58 @@ class TestGatewayBotCommunication(unittest.TestCase):
         self.assertEqual(s1.get("theme"), "fantasy")
         self.assertEqual(s2.get("theme"), "scifi")
 
+    def test_batched_messages_return_aligned_responses(self):
+        resp = self.client.post(
+            "/api/messages",
+            json={
+                "messages": [
+                    {"sender": "GW", "content": "!adv scifi", "channel_idx": 1},
+                    {"sender": "GW", "content": "hello", "channel_idx": 2},
+                    {"sender": "GW", "content": "!status", "channel_idx": 1},
+                ]
+            },
+        )
+        responses = json.loads(resp.data)["responses"]
+        self.assertEqual(len(responses), 3)
+        self.assertIsNotNone(responses[0])
+        self.assertIsNone(responses[1])
+        self.assertIn("scifi", responses[2])
+
+    def test_slow_batch_entry_does_not_hold_up_other_channels(self):
+        fast_done = threading.Event()
+        handle = self.bot.handle_message
+
+        def handle_message(message):
+            if message.content == "slow":
+                # Only finishes once the other channel's entry has been handled
+                return "slow" if fast_done.wait(5) else "blocked"
+            response = handle(message)
+            fast_done.set()
+            return response
+
+        batch = {
+            "messages": [
+                {"sender": "GW", "content": "slow", "channel_idx": 1},
+                {"sender": "GW", "content": "!help", "channel_idx": 2},
+            ]
+        }
+        with patch.object(self.bot, "handle_message", side_effect=handle_message):
+            responses = json.loads(self.client.post("/api/messages", json=batch).data)["responses"]
+        self.assertEqual(responses[0], "slow")
+        self.assertIn("!adv", responses[1])
+
+    def test_batched_messages_rejects_bad_body(self):
+        self.assertEqual(self.client.post("/api/messages", json={"messages": "nope"}).status_code, 400)
+        too_many = {"messages": [{"content": "hi"}] * (MAX_MESSAGE_BATCH + 1)}
+        self.assertEqual(self.client.post("/api/messages", json=too_many).status_code, 400)
+
 
 # =============================================================================
 # TestSessionSynchronization
 # =============================================================================
 
 
+@patch.object(AdventureBot, "_call_ollama", stub_llm())
 class TestSessionSynchronization(unittest.TestCase):
     """Test session state management under concurrent access."""
 
@@ -213,9 +260,9 @@ class TestSessionSynchronization(unittest.TestCase):
             self.assertEqual(r.get("theme"), "horror")
 
     def test_expire_sessions_under_load(self):
-        for i in range(50):
-            self.bot._update_session(f"old_{i}", {"status": "active"})
-            self.bot._sessions[f"old_{i}"]["last_active"] = 0.0  # instant expire
+        with patch("adventure_bot.time.time", return_value=0.0):  # instant expire
+            for i in range(50):
+                self.bot._update_session(f"old_{i}", {"status": "active"})
         self.bot._expire_sessions()
         for i in range(50):
             self.assertEqual(self.bot._get_session(f"old_{i}"), {})
@@ -245,6 +292,7 @@ class TestSessionSynchronization(unittest.TestCase):
 # =============================================================================
 
 
+@patch.object(AdventureBot, "_call_ollama", stub_llm())
 class TestMultiUserScenarios(unittest.TestCase):
     """Multiple users interacting on the same and different channels."""
 
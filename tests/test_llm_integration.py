@@ -3,15 +3,15 @@ LLM integration tests – Ollama API calls, timeouts, fallbacks, and response pa
 All HTTP calls are mocked.
 """
 
-import os
-import sys
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import requests as req
 
-from adventure_bot import AdventureBot  # noqa: E402
-from meshcore import MeshCoreMessage  # noqa: E402
+from adventure_bot import MAX_HISTORY_ENTRIES, AdventureBot
+from meshcore import MeshCoreMessage
+from tests.test_utils import stub_llm
 
 
 def _make_bot(**kwargs) -> AdventureBot:
@@ -49,7 +49,7 @@ class TestOllamaAPI(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"response": "You find a dragon!"}
-        with patch("adventure_bot.requests.post", return_value=mock_response):
+        with patch.object(self.bot._http, "post", return_value=mock_response):
             result = self.bot._call_ollama(SESSION_KEY, choice=None, theme="fantasy")
         self.assertEqual(result, "You find a dragon!")
 
@@ -57,7 +57,7 @@ class TestOllamaAPI(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.status_code = 500
         mock_response.json.return_value = {}
-        with patch("adventure_bot.requests.post", return_value=mock_response):
+        with patch.object(self.bot._http, "post", return_value=mock_response):
             result = self.bot._call_ollama(SESSION_KEY, choice=None, theme="fantasy")
         self.assertIsNone(result)
 
@@ -65,7 +65,7 @@ class TestOllamaAPI(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"response": ""}
-        with patch("adventure_bot.requests.post", return_value=mock_response):
+        with patch.object(self.bot._http, "post", return_value=mock_response):
             result = self.bot._call_ollama(SESSION_KEY, choice=None, theme="fantasy")
         self.assertIsNone(result)
 
@@ -73,7 +73,7 @@ class TestOllamaAPI(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"response": "story"}
-        with patch("adventure_bot.requests.post", return_value=mock_response) as mock_post:
+        with patch.object(self.bot._http, "post", return_value=mock_response) as mock_post:
             self.bot._call_ollama(SESSION_KEY, choice=None, theme="fantasy")
         called_url = mock_post.call_args[0][0]
         self.assertIn("/api/generate", called_url)
@@ -82,7 +82,7 @@ class TestOllamaAPI(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"response": "story"}
-        with patch("adventure_bot.requests.post", return_value=mock_response) as mock_post:
+        with patch.object(self.bot._http, "post", return_value=mock_response) as mock_post:
             self.bot._call_ollama(SESSION_KEY, choice=None, theme="fantasy")
         payload = mock_post.call_args[1]["json"]
         self.assertIn("model", payload)
@@ -91,7 +91,7 @@ class TestOllamaAPI(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"response": "story"}
-        with patch("adventure_bot.requests.post", return_value=mock_response) as mock_post:
+        with patch.object(self.bot._http, "post", return_value=mock_response) as mock_post:
             self.bot._call_ollama(SESSION_KEY, choice=None, theme="scifi")
         payload = mock_post.call_args[1]["json"]
         self.assertIn("prompt", payload)
@@ -102,11 +102,19 @@ class TestOllamaAPI(unittest.TestCase):
         mock_response.status_code = 200
         mock_response.json.return_value = {"response": "story"}
         self.bot._update_session(SESSION_KEY, {"history": ["opening scene"]})
-        with patch("adventure_bot.requests.post", return_value=mock_response) as mock_post:
+        with patch.object(self.bot._http, "post", return_value=mock_response) as mock_post:
             self.bot._call_ollama(SESSION_KEY, choice="2", theme="fantasy")
         payload = mock_post.call_args[1]["json"]
         self.assertIn("2", payload["prompt"])
 
+    def test_http_session_is_per_thread(self):
+        other = []
+        worker = threading.Thread(target=lambda: other.append(self.bot._http))
+        worker.start()
+        worker.join()
+        self.assertIs(self.bot._http, self.bot._http)
+        self.assertIsNot(other[0], self.bot._http)
+
 
 # =============================================================================
 # TestTimeoutHandling
@@ -121,28 +129,22 @@ class TestTimeoutHandling(unittest.TestCase):
         self.bot._update_session(SESSION_KEY, ACTIVE_SESSION.copy())
 
     def test_connection_error_returns_none(self):
-        import requests as req
-
-        with patch("adventure_bot.requests.post", side_effect=req.exceptions.ConnectionError("refused")):
+        with patch.object(self.bot._http, "post", side_effect=req.exceptions.ConnectionError("refused")):
             result = self.bot._call_ollama(SESSION_KEY, choice=None, theme="fantasy")
         self.assertIsNone(result)
 
     def test_timeout_error_returns_none(self):
-        import requests as req
-
-        with patch("adventure_bot.requests.post", side_effect=req.exceptions.Timeout("timed out")):
+        with patch.object(self.bot._http, "post", side_effect=req.exceptions.Timeout("timed out")):
             result = self.bot._call_ollama(SESSION_KEY, choice=None, theme="fantasy")
         self.assertIsNone(result)
 
     def test_generic_exception_returns_none(self):
-        with patch("adventure_bot.requests.post", side_effect=Exception("unexpected")):
+        with patch.object(self.bot._http, "post", side_effect=Exception("unexpected")):
             result = self.bot._call_ollama(SESSION_KEY, choice=None, theme="fantasy")
         self.assertIsNone(result)
 
     def test_timeout_triggers_fallback(self):
-        import requests as req
-
-        with patch("adventure_bot.requests.post", side_effect=req.exceptions.Timeout("timed out")):
+        with patch.object(self.bot._http, "post", side_effect=req.exceptions.Timeout("timed out")):
             result = self.bot._generate_story(SESSION_KEY, choice=None, theme="fantasy")
         # Should fall back to tree story
         self.assertIsNotNone(result)
@@ -159,7 +161,7 @@ class TestFallbackBehavior(unittest.TestCase):
 
     def setUp(self):
         self.bot = _make_bot()
-        self.bot._call_ollama = MagicMock(return_value=None)
+        self.bot._call_ollama = stub_llm()
         self.bot._update_session(SESSION_KEY, ACTIVE_SESSION.copy())
 
     def test_fallback_for_fantasy(self):
@@ -182,7 +184,7 @@ class TestFallbackBehavior(unittest.TestCase):
         self.assertIsNotNone(result)
 
     def test_llm_result_preferred_over_fallback(self):
-        self.bot._call_ollama = MagicMock(return_value="LLM generated story")
+        self.bot._call_ollama = stub_llm("LLM generated story")
         result = self.bot._generate_story(SESSION_KEY, choice=None, theme="fantasy")
         self.assertEqual(result, "LLM generated story")
 
@@ -200,31 +202,40 @@ class TestResponseParsing(unittest.TestCase):
         self.bot._update_session(SESSION_KEY, ACTIVE_SESSION.copy())
 
     def test_the_end_in_llm_response_marks_finished(self):
-        self.bot._call_ollama = MagicMock(return_value="You won! THE END")
+        self.bot._call_ollama = stub_llm("You won! THE END")
         self.bot._generate_story(SESSION_KEY, choice=None, theme="fantasy")
         self.assertEqual(self.bot._get_session(SESSION_KEY).get("status"), "finished")
 
     def test_non_terminal_response_stays_active(self):
-        self.bot._call_ollama = MagicMock(return_value="You find a fork.\n1:Left 2:Right 3:Back")
+        self.bot._call_ollama = stub_llm("You find a fork.\n1:Left 2:Right 3:Back")
         self.bot._generate_story(SESSION_KEY, choice=None, theme="fantasy")
         self.assertEqual(self.bot._get_session(SESSION_KEY).get("status"), "active")
 
     def test_llm_response_added_to_history(self):
-        self.bot._call_ollama = MagicMock(return_value="Scene description")
+        self.bot._call_ollama = stub_llm("Scene description")
         self.bot._generate_story(SESSION_KEY, choice=None, theme="fantasy")
         history = self.bot._get_session(SESSION_KEY).get("history", [])
         self.assertIn("Scene description", history)
 
     def test_multiple_llm_calls_build_history(self):
-        self.bot._call_ollama = MagicMock(return_value="Scene 1")
+        self.bot._call_ollama = stub_llm("Scene 1")
         self.bot._generate_story(SESSION_KEY, choice=None, theme="fantasy")
-        self.bot._call_ollama = MagicMock(return_value="Scene 2")
+        self.bot._call_ollama = stub_llm("Scene 2")
         self.bot._generate_story(SESSION_KEY, choice="1", theme="fantasy")
         history = self.bot._get_session(SESSION_KEY).get("history", [])
         self.assertGreaterEqual(len(history), 2)
 
+    def test_history_is_bounded(self):
+        self.bot._update_session(SESSION_KEY, {"history": [f"Scene {i}" for i in range(MAX_HISTORY_ENTRIES)]})
+        self.bot._call_ollama = stub_llm("Newest scene")
+        self.bot._generate_story(SESSION_KEY, choice="A", theme="fantasy")
+        history = self.bot._get_session(SESSION_KEY)["history"]
+        self.assertEqual(len(history), MAX_HISTORY_ENTRIES)
+        self.assertEqual(history[0], "Scene 1")
+        self.assertEqual(history[-1], "Newest scene")
+
     def test_generate_story_returns_string(self):
-        self.bot._call_ollama = MagicMock(return_value=None)
+        self.bot._call_ollama = stub_llm()
         result = self.bot._generate_story(SESSION_KEY, choice=None, theme="fantasy")
         self.assertIsInstance(result, str)
 
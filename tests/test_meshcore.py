@@ -2,15 +2,11 @@
 Tests for meshcore.py – MeshCoreMessage, constants, frame parsing, and connection.
 """
 
-import os
-import sys
 import time
 import unittest
 from unittest.mock import MagicMock, PropertyMock, patch
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from meshcore import (  # noqa: E402
+from meshcore import (
     _CMD_APP_START,
     _CMD_SEND_CHAN_MSG,
     _FRAME_IN,
@@ -243,6 +239,40 @@ class TestMeshCoreFrameParsing(unittest.TestCase):
         except Exception as exc:
             self.skipTest(f"Skipped: {exc}")
 
+    def test_send_message_frame_layout(self):
+        try:
+            mc = self._make_meshcore()
+        except Exception as exc:
+            self.skipTest(f"Skipped: {exc}")
+        mc._serial = MagicMock(is_open=True)
+        mc.save_active_channels = lambda: None
+        with patch("meshcore.time.time", return_value=0x01020304):
+            mc.send_message("hé", "text", channel_idx=2)
+        frame = bytes(mc._serial.write.call_args_list[0][0][0])
+        text = "hé".encode("utf-8")
+        expected = (
+            bytes([_FRAME_IN])
+            + (7 + len(text)).to_bytes(2, "little")
+            + bytes([_CMD_SEND_CHAN_MSG, 0, 2])
+            + (0x01020304).to_bytes(4, "little")
+            + text
+        )
+        self.assertEqual(frame, expected)
+
+    def test_send_message_batch_saves_channels_once(self):
+        try:
+            mc = self._make_meshcore()
+        except Exception as exc:
+            self.skipTest(f"Skipped: {exc}")
+        mc._serial = MagicMock(is_open=True)
+        mc.save_active_channels = MagicMock()
+        sent = mc.send_message_batch(["one", "two", "three"], "text", channel_idx=3)
+        self.assertEqual([m.content for m in sent], ["one", "two", "three"])
+        mc.save_active_channels.assert_called_once()
+        # Each message is a channel-message frame followed by a sync command
+        frames = [bytes(c[0][0]) for c in mc._serial.write.call_args_list]
+        self.assertEqual([f[-3:] for f in frames[::2]], [b"one", b"two", b"ree"])
+
 
 # =============================================================================
 # TestMeshCoreConnection
@@ -3,47 +3,65 @@ Tests for radio_gateway.py – construction, HTTP forwarding, channel filtering,
 and retry/error behaviour.  All serial and HTTP I/O is mocked.
 """
 
-import os
-import sys
+import json
+import threading
 import unittest
 from unittest.mock import MagicMock, call, patch
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from meshcore import MeshCoreMessage
 
-from meshcore import MeshCoreMessage  # noqa: E402
+
+def _posted_payload(post_call):
+    """Decode the JSON body of a mocked session.post call (json= or orjson data=)."""
+    kwargs = post_call[1]
+    return kwargs["json"] if "json" in kwargs else json.loads(kwargs["data"])
+
+
+# MeshCore, requests.Session and the loggers are patched once for the whole
+# module rather than re-entering three patch() context managers per gateway
+_PATCHERS = (
+    patch("radio_gateway.MeshCore"),
+    patch("radio_gateway.requests.Session"),
+    patch("radio_gateway.get_meshcore_logger"),
+)
+_MOCKS = []
+
+
+def setUpModule():
+    _MOCKS.extend(p.start() for p in _PATCHERS)
+
+
+def tearDownModule():
+    for p in reversed(_PATCHERS):
+        p.stop()
+    del _MOCKS[:]
 
 
 def _make_gateway(**kwargs):
     """
     Build a RadioGateway without touching any hardware or network.
 
-    We patch MeshCore and requests.Session so the constructor succeeds.
+    MeshCore and requests.Session are patched module-wide so the constructor
+    succeeds; each gateway still gets its own fresh mock instances.
     """
     from radio_gateway import RadioGateway
 
-    with patch("radio_gateway.MeshCore") as MockMesh, patch("radio_gateway.requests.Session") as MockSession, patch(
-        "radio_gateway.get_meshcore_logger"
-    ) as MockLogger:
-
-        mock_mesh_instance = MagicMock()
-        MockMesh.return_value = mock_mesh_instance
-        mock_session_instance = MagicMock()
-        MockSession.return_value = mock_session_instance
-        MockLogger.return_value = (MagicMock(), MagicMock())
-
-        defaults = dict(
-            bot_server_url="http://localhost:5000",
-            port=None,
-            baud=115200,
-            debug=False,
-            allowed_channel_idx=None,
-            node_id="TEST_GW",
-            timeout=10,
-        )
-        defaults.update(kwargs)
-        gw = RadioGateway(**defaults)
+    MockMesh, MockSession, MockLogger = _MOCKS
+    MockMesh.return_value = MagicMock()
+    MockSession.return_value = MagicMock()
+    MockLogger.return_value = (MagicMock(), MagicMock())
 
-    return gw
+    defaults = dict(
+        bot_server_url="http://localhost:5000",
+        port=None,
+        baud=115200,
+        debug=False,
+        allowed_channel_idx=None,
+        node_id="TEST_GW",
+        timeout=10,
+    )
+    defaults.update(kwargs)
+    return RadioGateway(**defaults)
 
 
 # =============================================================================
@@ -133,14 +151,14 @@ class TestHTTPForwarding(unittest.TestCase):
         self.mock_session.post.return_value = self._good_response("ok")
         msg = MeshCoreMessage(sender="Carol", content="!help", channel_idx=1)
         self.gw._forward_to_bot(msg)
-        payload = self.mock_session.post.call_args[1]["json"]
+        payload = _posted_payload(self.mock_session.post.call_args)
         self.assertEqual(payload["sender"], "Carol")
 
     def test_forward_includes_content_in_payload(self):
         self.mock_session.post.return_value = self._good_response("ok")
         msg = MeshCoreMessage(sender="Dave", content="!quit", channel_idx=1)
         self.gw._forward_to_bot(msg)
-        payload = self.mock_session.post.call_args[1]["json"]
+        payload = _posted_payload(self.mock_session.post.call_args)
         self.assertEqual(payload["content"], "!quit")
 
     def test_forward_returns_none_on_http_error(self):
@@ -190,6 +208,22 @@ class TestHTTPForwarding(unittest.TestCase):
         self.gw.handle_message(msg)
         self.assertEqual(self.gw.stats["messages_failed"], 1)
 
+    def test_radio_handler_forwards_on_worker_thread(self):
+        self.mock_session.post.return_value = self._good_response("ok")
+        self.gw.mesh = MagicMock()
+        msg = MeshCoreMessage(sender="Alice", content="!adv", channel_idx=1)
+        self.gw._submit_message(msg)
+        self.gw._executor.shutdown(wait=True)
+        self.assertEqual(self.gw.stats["responses_sent"], 1)
+
+    def test_worker_error_is_logged_and_counted(self):
+        self.gw.error_logger = MagicMock()
+        with patch.object(self.gw, "handle_message", side_effect=RuntimeError("radio gone")):
+            self.gw._submit_message(MeshCoreMessage(sender="Alice", content="!adv", channel_idx=1))
+            self.gw._executor.shutdown(wait=True)
+        self.assertEqual(self.gw.stats["messages_failed"], 1)
+        self.assertIsInstance(self.gw.error_logger.error.call_args[1]["exc_info"], RuntimeError)
+
 
 # =============================================================================
 # TestChannelFiltering
@@ -224,6 +258,12 @@ class TestChannelFiltering(unittest.TestCase):
         self.gw.handle_message(msg)
         self.assertEqual(self.gw.stats["messages_received"], 1)
 
+    def test_wrong_channel_dropped_before_worker_handoff(self):
+        self.gw._executor = MagicMock()
+        self.gw._submit_message(MeshCoreMessage(sender="A", content="!adv", channel_idx=3))
+        self.gw._executor.submit.assert_not_called()
+        self.assertEqual(self.gw.stats["messages_received"], 1)
+
     def test_no_filter_forwards_all_channels(self):
         gw = _make_gateway(allowed_channel_idx=None)
         gw.session = self.mock_session
@@ -274,7 +314,8 @@ class TestRetryLogic(unittest.TestCase):
         gw.mesh = MagicMock()
         text = "Part one\n---PART---\nPart two"
         gw._send_response(text, channel_idx=1)
-        self.assertEqual(gw.mesh.send_message.call_count, 2)
+        gw.mesh.send_message_batch.assert_called_once()
+        self.assertEqual(gw.mesh.send_message_batch.call_args[0][0], ["Part one", "Part two"])
 
     def test_single_response_sent_as_one_message(self):
         gw = _make_gateway()
@@ -283,5 +324,130 @@ class TestRetryLogic(unittest.TestCase):
         self.assertEqual(gw.mesh.send_message.call_count, 1)
 
 
+# =============================================================================
+# TestForwardBatching
+# =============================================================================
+
+
+class _SignallingList(list):
+    """List that sets ``filled`` once it holds *count* items, to sequence batching tests without sleeps."""
+
+    def __init__(self, count):
+        super().__init__()
+        self.count = count
+        self.filled = threading.Event()
+
+    def append(self, item):
+        super().append(item)
+        if len(self) >= self.count:
+            self.filled.set()
+
+
+class TestForwardBatching(unittest.TestCase):
+    """Concurrent forwards share one /api/messages POST; lone ones use /api/message."""
+
+    def _batcher(self):
+        from radio_gateway import _ForwardBatcher
+
+        self.singles, self.batches = [], []
+
+        def send_one(m):
+            self.singles.append(m)
+            return f"one:{m.content}"
+
+        def send_batch(ms):
+            self.batches.append(ms)
+            return [f"batch:{m.content}" for m in ms]
+
+        return _ForwardBatcher(send_one, send_batch)
+
+    def test_lone_message_uses_single_path(self):
+        batcher = self._batcher()
+        msg = MeshCoreMessage(sender="A", content="!adv", channel_idx=1)
+        self.assertEqual(batcher.forward(msg), "one:!adv")
+        self.assertEqual(self.batches, [])
+
+    def _hold_leader_until(self, batcher, count):
+        """Make the batching delay last until *count* messages are pending, instead of a timed sleep."""
+        pending = _SignallingList(count)
+        batcher._pending = pending
+        return patch("radio_gateway.time.sleep", side_effect=lambda _: pending.filled.wait(5))
+
+    def test_concurrent_messages_share_one_batch(self):
+        batcher = self._batcher()
+        results = {}
+        msgs = [MeshCoreMessage(sender="A", content=c, channel_idx=1) for c in ("A", "B")]
+        with self._hold_leader_until(batcher, 2):
+            leader = threading.Thread(target=lambda: results.update(a=batcher.forward(msgs[0])))
+            leader.start()
+            results["b"] = batcher.forward(msgs[1])
+            leader.join()
+        self.assertEqual(results, {"a": "batch:A", "b": "batch:B"})
+        self.assertEqual(len(self.batches), 1)
+
+    def test_overflow_is_handed_to_a_waiting_caller(self):
+        batcher = self._batcher()
+        results = {}
+        msgs = [MeshCoreMessage(sender="A", content=c, channel_idx=1) for c in ("A", "B")]
+        with self._hold_leader_until(batcher, 2), patch("radio_gateway.MAX_BATCH_SIZE", 1):
+            leader = threading.Thread(target=lambda: results.update(a=batcher.forward(msgs[0])))
+            leader.start()
+            results["b"] = batcher.forward(msgs[1])
+            leader.join()
+        # The leader sent only its own message; B was promoted and sent its own
+        self.assertEqual(results, {"a": "one:A", "b": "one:B"})
+        self.assertEqual(self.batches, [])
+
+    def test_slow_reply_does_not_hold_up_other_callers(self):
+        from radio_gateway import _ForwardBatcher
+
+        started = {c: threading.Event() for c in "AB"}
+        release = {c: threading.Event() for c in "AB"}
+
+        def send_one(m):
+            started[m.content].set()
+            release[m.content].wait(5)
+            return f"one:{m.content}"
+
+        batcher = _ForwardBatcher(send_one, MagicMock())
+        results = {}
+        threads = {
+            c: threading.Thread(
+                target=lambda c=c: results.update({c: batcher.forward(MeshCoreMessage(sender="S", content=c))})
+            )
+            for c in "AB"
+        }
+        with patch("radio_gateway.time.sleep"):
+            threads["A"].start()
+            self.assertTrue(started["A"].wait(5))
+            # B leads its own batch while A's POST is still in flight
+            threads["B"].start()
+            self.assertTrue(started["B"].wait(5))
+            # A gets its reply as soon as its own POST finishes, not after B's
+            release["A"].set()
+            threads["A"].join(5)
+            self.assertEqual(results, {"A": "one:A"})
+            release["B"].set()
+            threads["B"].join(5)
+        self.assertEqual(results, {"A": "one:A", "B": "one:B"})
+
+    def test_batch_timeout_scales_with_batch_size(self):
+        gw = _make_gateway()
+        gw.session = MagicMock()
+        gw.session.post.return_value.json.return_value = {"responses": ["a", "b", "c"]}
+        msgs = [MeshCoreMessage(sender="A", content=c, channel_idx=1) for c in "ABC"]
+        self.assertEqual(gw._forward_batch_to_bot(msgs), ["a", "b", "c"])
+        self.assertEqual(gw.session.post.call_args[1]["timeout"], (gw.timeout, gw.timeout * 3))
+
+    def test_missing_batch_endpoint_disables_batching(self):
+        gw = _make_gateway()
+        gw.session = MagicMock()
+        gw.session.post.return_value = MagicMock(status_code=404)
+        msgs = [MeshCoreMessage(sender="A", content=c, channel_idx=1) for c in ("A", "B")]
+        self.assertIsNone(gw._forward_batch_to_bot(msgs))
+        self.assertFalse(gw._batcher.batch_supported)
+        self.assertIn("/api/messages", gw.session.post.call_args[0][0])
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
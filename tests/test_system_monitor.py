@@ -0,0 +1,37 @@
+"""
+Tests for utils/system_monitor.py – parsing of vcgencmd temperature output.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from utils.system_monitor import SystemMonitor
+
+
+class TestVcgencmdTemperature(unittest.TestCase):
+    """get_cpu_temperature falls back to vcgencmd when no sysfs zone is readable."""
+
+    def _temperature(self, output):
+        monitor = SystemMonitor()
+        self.addCleanup(monitor.close)
+        outputs = {("vcgencmd", "measure_temp"): output}
+        with patch.object(monitor, "_read_sysfs", return_value=None), patch.object(
+            monitor, "_run", side_effect=lambda cmd: outputs.get(tuple(cmd))
+        ):
+            return monitor.get_cpu_temperature()
+
+    def test_positive_reading(self):
+        self.assertEqual(self._temperature("temp=48.3'C\n"), 48.3)
+
+    def test_whole_degree_reading(self):
+        self.assertEqual(self._temperature("temp=51'C\n"), 51.0)
+
+    def test_below_zero_reading(self):
+        self.assertEqual(self._temperature("temp=-5.0'C\n"), -5.0)
+
+    def test_unparseable_output(self):
+        self.assertIsNone(self._temperature("error: VCHI not available\n"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
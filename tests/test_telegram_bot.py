@@ -5,30 +5,32 @@ Tests for MCADV Telegram Bot.
 These tests use mocks so no real Telegram token or server is required.
 """
 
+import importlib.util
 import json
-import os
 import pathlib
-import sys
+import shutil
 import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-# Provide stub telegram package so tests work without installing python-telegram-bot
-try:
-    from telegram_bot import (  # noqa: E402
-        MCADVTelegramBot,
-        _create_choice_keyboard,
-        _create_theme_keyboard,
-        _escape_md,
-        _parse_story_response,
-        _session_key_to_channel,
-    )
-
-    _IMPORT_OK = True
-except ImportError:
-    _IMPORT_OK = False
+import requests
+
+# Only import telegram_bot when python-telegram-bot is installed; otherwise
+# every test below is skipped without paying for the failed import
+_IMPORT_OK = importlib.util.find_spec("telegram") is not None
+if _IMPORT_OK:
+    try:
+        from telegram_bot import (
+            MCADVTelegramBot,
+            _create_choice_keyboard,
+            _create_theme_keyboard,
+            _escape_md,
+            _parse_story_response,
+            _session_key_to_channel,
+        )
+    except ImportError:
+        # e.g. an incompatible python-telegram-bot version
+        _IMPORT_OK = False
 
 
 @unittest.skipUnless(_IMPORT_OK, "python-telegram-bot not installed")
@@ -100,23 +102,22 @@ class TestEscapeMd(unittest.TestCase):
 class TestCreateChoiceKeyboard(unittest.TestCase):
     """Tests for _create_choice_keyboard()."""
 
+    @classmethod
+    def setUpClass(cls):
+        # One keyboard serves every shape assertion below
+        cls.keyboard = _create_choice_keyboard(["Go north", "Go east", "Go south"])
+
     def test_creates_buttons_plus_quit(self):
-        choices = ["Go north", "Go east", "Go south"]
-        keyboard = _create_choice_keyboard(choices)
         # 3 choice rows + 1 quit row
-        self.assertEqual(len(keyboard.inline_keyboard), 4)
+        self.assertEqual(len(self.keyboard.inline_keyboard), 4)
 
     def test_callback_data_format(self):
-        choices = ["Option A", "Option B"]
-        keyboard = _create_choice_keyboard(choices)
-        self.assertEqual(keyboard.inline_keyboard[0][0].callback_data, "choice_1")
-        self.assertEqual(keyboard.inline_keyboard[1][0].callback_data, "choice_2")
-        self.assertEqual(keyboard.inline_keyboard[-1][0].callback_data, "quit")
+        self.assertEqual(self.keyboard.inline_keyboard[0][0].callback_data, "choice_1")
+        self.assertEqual(self.keyboard.inline_keyboard[1][0].callback_data, "choice_2")
+        self.assertEqual(self.keyboard.inline_keyboard[-1][0].callback_data, "quit")
 
     def test_emojis_on_first_three_choices(self):
-        choices = ["A", "B", "C"]
-        keyboard = _create_choice_keyboard(choices)
-        button_text = keyboard.inline_keyboard[0][0].text
+        button_text = self.keyboard.inline_keyboard[0][0].text
         self.assertIn("1️⃣", button_text)
 
 
@@ -124,24 +125,36 @@ class TestCreateChoiceKeyboard(unittest.TestCase):
 class TestCreateThemeKeyboard(unittest.TestCase):
     """Tests for _create_theme_keyboard()."""
 
+    @classmethod
+    def setUpClass(cls):
+        cls.keyboard = _create_theme_keyboard(["fantasy", "scifi", "horror"])
+
     def test_one_button_per_theme(self):
-        themes = ["fantasy", "scifi", "horror"]
-        keyboard = _create_theme_keyboard(themes)
-        self.assertEqual(len(keyboard.inline_keyboard), 3)
+        self.assertEqual(len(self.keyboard.inline_keyboard), 3)
 
     def test_callback_data_format(self):
-        themes = ["fantasy"]
-        keyboard = _create_theme_keyboard(themes)
-        self.assertEqual(keyboard.inline_keyboard[0][0].callback_data, "theme_fantasy")
+        self.assertEqual(self.keyboard.inline_keyboard[0][0].callback_data, "theme_fantasy")
 
 
 @unittest.skipUnless(_IMPORT_OK, "python-telegram-bot not installed")
 class TestMCADVTelegramBot(unittest.TestCase):
     """Tests for MCADVTelegramBot class."""
 
-    def _make_bot(self, tmp_dir):
-        """Create a bot with session file in a temp directory."""
-        with patch("telegram_bot.SESSION_FILE", new=pathlib.Path(tmp_dir) / "sessions.json"):
+    @classmethod
+    def setUpClass(cls):
+        # One temp directory for the whole class; tests only need a path inside it.
+        # Prefer tmpfs on Linux so the persistence round trip stays in RAM.
+        tmp_root = "/dev/shm" if pathlib.Path("/dev/shm").is_dir() else None
+        cls._tmp = tempfile.mkdtemp(dir=tmp_root)
+        cls._session_path = pathlib.Path(cls._tmp) / "sessions.json"
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls._tmp, ignore_errors=True)
+
+    def _make_bot(self):
+        """Create a bot with its session file in the class temp directory."""
+        with patch("telegram_bot.SESSION_FILE", new=self._session_path):
             with patch("telegram.ext.Updater.__init__", return_value=None):
                 bot = MCADVTelegramBot.__new__(MCADVTelegramBot)
                 bot.token = "test_token"
@@ -156,59 +169,52 @@ class TestMCADVTelegramBot(unittest.TestCase):
         update = MagicMock()
         update.effective_chat.type = "private"
         update.effective_user.id = 12345
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            key = bot._session_key(update)
+        bot = self._make_bot()
+        key = bot._session_key(update)
         self.assertEqual(key, "user_12345")
 
     def test_session_key_group_chat(self):
         update = MagicMock()
         update.effective_chat.type = "group"
         update.effective_chat.id = 67890
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            key = bot._session_key(update)
+        bot = self._make_bot()
+        key = bot._session_key(update)
         self.assertEqual(key, "group_67890")
 
     def test_is_group_chat_private(self):
         update = MagicMock()
         update.effective_chat.type = "private"
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            self.assertFalse(bot._is_group_chat(update))
+        bot = self._make_bot()
+        self.assertFalse(bot._is_group_chat(update))
 
     def test_is_group_chat_group(self):
         update = MagicMock()
         update.effective_chat.type = "group"
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            self.assertTrue(bot._is_group_chat(update))
+        bot = self._make_bot()
+        self.assertTrue(bot._is_group_chat(update))
 
     @patch("requests.post")
     def test_start_adventure_success(self, mock_post):
         mock_post.return_value.status_code = 200
         mock_post.return_value.raise_for_status = MagicMock()
         mock_post.return_value.json.return_value = {"response": "You stand at a crossroads.\n1:North 2:East 3:South"}
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            result = bot.start_adventure("user_1", "fantasy")
+        bot = self._make_bot()
+        result = bot.start_adventure("user_1", "fantasy")
         self.assertNotIn("error", result)
         self.assertIn("crossroads", result["story"])
         self.assertEqual(result["choices"], ["North", "East", "South"])
 
     @patch("requests.post")
     def test_start_adventure_connection_error(self, mock_post):
-        mock_post.side_effect = __import__("requests").ConnectionError("refused")
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            result = bot.start_adventure("user_1", "fantasy")
+        mock_post.side_effect = requests.ConnectionError("refused")
+        bot = self._make_bot()
+        result = bot.start_adventure("user_1", "fantasy")
         self.assertTrue(result.get("error"))
 
     @patch("requests.post")
     def test_make_choice_no_session(self, mock_post):
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            result = bot.make_choice("user_99", 1)
+        bot = self._make_bot()
+        result = bot.make_choice("user_99", 1)
         self.assertTrue(result.get("error"))
 
     @patch("requests.post")
@@ -216,59 +222,54 @@ class TestMCADVTelegramBot(unittest.TestCase):
         mock_post.return_value.status_code = 200
         mock_post.return_value.raise_for_status = MagicMock()
         mock_post.return_value.json.return_value = {"response": "You enter the forest.\n1:Fight 2:Flee 3:Hide"}
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            bot.sessions["user_1"] = {"status": "active", "theme": "fantasy", "channel_idx": 1}
-            result = bot.make_choice("user_1", 1)
+        bot = self._make_bot()
+        bot.sessions["user_1"] = {"status": "active", "theme": "fantasy", "channel_idx": 1}
+        result = bot.make_choice("user_1", 1)
         self.assertNotIn("error", result)
         self.assertEqual(result["choices"], ["Fight", "Flee", "Hide"])
 
     def test_format_story_message_with_choices(self):
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            text, keyboard = bot.format_story_message("You enter a cave.", ["Go deeper", "Turn back", "Light a torch"])
+        bot = self._make_bot()
+        text, keyboard = bot.format_story_message("You enter a cave.", ["Go deeper", "Turn back", "Light a torch"])
         self.assertIn("cave", text)
         # 3 choices + quit button
         self.assertEqual(len(keyboard.inline_keyboard), 4)
 
     def test_format_story_message_no_choices(self):
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            text, keyboard = bot.format_story_message("THE END. You won!", [])
+        bot = self._make_bot()
+        text, keyboard = bot.format_story_message("THE END. You won!", [])
         self.assertIn("THE END", text)
 
     def test_session_persistence(self):
-        with tempfile.TemporaryDirectory() as tmp:
-            session_path = pathlib.Path(tmp) / "sessions.json"
-
-            # Create bot and write sessions
-            bot = MCADVTelegramBot.__new__(MCADVTelegramBot)
-            bot.token = "test"
-            bot.server_url = "http://test:5000"
-            bot.sessions = {"user_1": {"status": "active", "theme": "fantasy"}}
-            bot._register_handlers = MagicMock()
-
-            # Patch SESSION_FILE for save/load
-            import telegram_bot as tb
-
-            orig = tb.SESSION_FILE
-            tb.SESSION_FILE = session_path
-            try:
-                bot._save_sessions()
-                self.assertTrue(session_path.exists())
-
-                # Load into a new bot
-                bot2 = MCADVTelegramBot.__new__(MCADVTelegramBot)
-                bot2.sessions = {}
-                bot2._load_sessions()
-                self.assertIn("user_1", bot2.sessions)
-            finally:
-                tb.SESSION_FILE = orig
+        session_path = self._session_path
+
+        # Create bot and write sessions
+        bot = MCADVTelegramBot.__new__(MCADVTelegramBot)
+        bot.token = "test"
+        bot.server_url = "http://test:5000"
+        bot.sessions = {"user_1": {"status": "active", "theme": "fantasy"}}
+        bot._register_handlers = MagicMock()
+
+        # Patch SESSION_FILE for save/load
+        import telegram_bot as tb
+
+        orig = tb.SESSION_FILE
+        tb.SESSION_FILE = session_path
+        try:
+            bot._save_sessions()
+            self.assertTrue(session_path.exists())
+
+            # Load into a new bot
+            bot2 = MCADVTelegramBot.__new__(MCADVTelegramBot)
+            bot2.sessions = {}
+            bot2._load_sessions()
+            self.assertIn("user_1", bot2.sessions)
+        finally:
+            tb.SESSION_FILE = orig
 
     def test_fetch_themes_returns_list(self):
-        with tempfile.TemporaryDirectory() as tmp:
-            bot = self._make_bot(tmp)
-            themes = bot._fetch_themes()
+        bot = self._make_bot()
+        themes = bot._fetch_themes()
         self.assertIsInstance(themes, list)
         self.assertIn("fantasy", themes)
 
@@ -3,20 +3,21 @@
 Tests for MCADV Terminal Client.
 """
 
+import copy
 import json
 import os
-import sys
 import unittest
 from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 from unittest.mock import MagicMock, mock_open, patch
 
 import requests
+from click.testing import CliRunner
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from terminal_client import (  # noqa: E402
+from terminal_client import (
     DEFAULT_CONFIG,
     MCADVTerminalClient,
+    cli,
     detect_terminal,
     load_config,
     load_history,
@@ -25,52 +26,66 @@ from terminal_client import (  # noqa: E402
     supports_color,
 )
 
+# CliRunner keeps no state between invoke() calls, so one runner serves every test
+RUNNER = CliRunner()
+
+# Read-only view of the defaults for tests that only display the config
+FROZEN_DEFAULT_CONFIG = MappingProxyType(dict(DEFAULT_CONFIG))
+
+# Config file contents for the load_config tests, serialised once at import
+FULL_CFG_JSON = json.dumps({"server_url": "http://test:9999", "theme_preference": "scifi"})
+PARTIAL_CFG_JSON = json.dumps({"server_url": "http://partial:1234"})
+BAD_JSON = "not-json"
+
 
 class TestConfigHelpers(unittest.TestCase):
     """Tests for configuration load/save helpers."""
 
+    # open() stubs built once; mock_open rewinds read_data on every open() call
+    _MOPEN_FULL = mock_open(read_data=FULL_CFG_JSON)
+    _MOPEN_PARTIAL = mock_open(read_data=PARTIAL_CFG_JSON)
+    _MOPEN_BAD = mock_open(read_data=BAD_JSON)
+
+    def tearDown(self):
+        for stub in (self._MOPEN_FULL, self._MOPEN_PARTIAL, self._MOPEN_BAD):
+            stub.reset_mock()
+
     def test_load_config_returns_defaults_when_missing(self):
         with patch("terminal_client.CONFIG_PATH", Path("/nonexistent/path/config.json")):
             cfg = load_config()
         self.assertEqual(cfg["server_url"], DEFAULT_CONFIG["server_url"])
 
     def test_load_config_reads_existing_file(self):
-        data = {"server_url": "http://test:9999", "theme_preference": "scifi"}
-        m = mock_open(read_data=json.dumps(data))
-        fake_path = MagicMock(spec=Path)
-        fake_path.exists.return_value = True
-        fake_path.__truediv__ = Path.__truediv__
+        fake_path = SimpleNamespace(exists=lambda: True)
         with patch("terminal_client.CONFIG_PATH", fake_path):
-            with patch("builtins.open", m):
+            with patch("builtins.open", self._MOPEN_FULL):
                 cfg = load_config()
         self.assertEqual(cfg["server_url"], "http://test:9999")
 
     def test_load_config_fills_missing_keys(self):
-        partial = {"server_url": "http://partial:1234"}
-        fake_path = MagicMock(spec=Path)
-        fake_path.exists.return_value = True
+        fake_path = SimpleNamespace(exists=lambda: True)
         with patch("terminal_client.CONFIG_PATH", fake_path):
-            with patch("builtins.open", mock_open(read_data=json.dumps(partial))):
+            with patch("builtins.open", self._MOPEN_PARTIAL):
                 cfg = load_config()
         for key in DEFAULT_CONFIG:
             self.assertIn(key, cfg)
 
     def test_load_config_handles_invalid_json(self):
-        fake_path = MagicMock(spec=Path)
-        fake_path.exists.return_value = True
+        fake_path = SimpleNamespace(exists=lambda: True)
         with patch("terminal_client.CONFIG_PATH", fake_path):
-            with patch("builtins.open", mock_open(read_data="not-json")):
+            with patch("builtins.open", self._MOPEN_BAD):
                 cfg = load_config()
         self.assertEqual(cfg, DEFAULT_CONFIG)
 
     def test_save_config_creates_directory(self):
         cfg = DEFAULT_CONFIG.copy()
-        fake_path = MagicMock(spec=Path)
-        fake_path.parent = MagicMock()
+        fake_path = SimpleNamespace(parent=SimpleNamespace(mkdir=MagicMock()))
         with patch("terminal_client.CONFIG_PATH", fake_path):
             with patch("builtins.open", mock_open()):
                 save_config(cfg)
-        fake_path.parent.mkdir.assert_called_once_with(parents=True, exist_ok=True)
+        mkdir = fake_path.parent.mkdir
+        self.assertEqual(mkdir.call_count, 1)
+        self.assertEqual(mkdir.call_args.kwargs, {"parents": True, "exist_ok": True})
 
 
 class TestHistoryHelpers(unittest.TestCase):
@@ -82,42 +97,38 @@ class TestHistoryHelpers(unittest.TestCase):
         self.assertEqual(hist, [])
 
     def test_load_history_handles_invalid_json(self):
-        fake_path = MagicMock(spec=Path)
-        fake_path.exists.return_value = True
+        fake_path = SimpleNamespace(exists=lambda: True)
         with patch("terminal_client.HISTORY_PATH", fake_path):
-            with patch("builtins.open", mock_open(read_data="bad")):
+            with patch("builtins.open", mock_open(read_data=BAD_JSON)):
                 hist = load_history()
         self.assertEqual(hist, [])
 
     def test_save_history_creates_directory(self):
-        fake_path = MagicMock(spec=Path)
-        fake_path.parent = MagicMock()
+        fake_path = SimpleNamespace(parent=SimpleNamespace(mkdir=MagicMock()))
         with patch("terminal_client.HISTORY_PATH", fake_path):
             with patch("builtins.open", mock_open()):
                 save_history([{"step": 1}])
-        fake_path.parent.mkdir.assert_called_once_with(parents=True, exist_ok=True)
+        mkdir = fake_path.parent.mkdir
+        self.assertEqual(mkdir.call_count, 1)
+        self.assertEqual(mkdir.call_args.kwargs, {"parents": True, "exist_ok": True})
 
 
 class TestPlatformHelpers(unittest.TestCase):
     """Tests for terminal detection helpers."""
 
-    def test_detect_terminal_windows(self):
-        with patch("sys.platform", "win32"):
-            result = detect_terminal()
-        self.assertEqual(result, "windows")
-
-    def test_detect_terminal_uses_term_env(self):
-        with patch("sys.platform", "linux"):
-            with patch.dict(os.environ, {"TERM": "xterm-256color"}):
-                result = detect_terminal()
-        self.assertEqual(result, "xterm-256color")
+    DETECT_TERMINAL_CASES = [
+        ("win32", "xterm-256color", "windows"),
+        ("linux", "xterm-256color", "xterm-256color"),
+        ("linux", None, "unknown"),
+    ]
 
-    def test_detect_terminal_unknown(self):
-        with patch("sys.platform", "linux"):
-            env = {k: v for k, v in os.environ.items() if k != "TERM"}
-            with patch.dict(os.environ, env, clear=True):
-                result = detect_terminal()
-        self.assertEqual(result, "unknown")
+    def test_detect_terminal(self):
+        base_env = {k: v for k, v in os.environ.items() if k != "TERM"}
+        for platform, term, expected in self.DETECT_TERMINAL_CASES:
+            with self.subTest(platform=platform, term=term):
+                env = dict(base_env) if term is None else dict(base_env, TERM=term)
+                with patch("sys.platform", platform), patch.dict(os.environ, env, clear=True):
+                    self.assertEqual(detect_terminal(), expected)
 
     def test_supports_color_false_when_not_tty(self):
         with patch("sys.stdout") as mock_stdout:
@@ -129,8 +140,23 @@ class TestPlatformHelpers(unittest.TestCase):
 class TestMCADVTerminalClient(unittest.TestCase):
     """Tests for the MCADVTerminalClient class."""
 
+    @classmethod
+    def setUpClass(cls):
+        # Build the client once, without reading the real ~/.mcadv history
+        with patch("terminal_client.load_history", return_value=[]):
+            cls._client_proto = MCADVTerminalClient(server_url="http://test:5000")
+
     def setUp(self):
-        self.client = MCADVTerminalClient(server_url="http://test:5000")
+        self.client = copy.copy(self._client_proto)
+        self.client.session_id = None
+        self.client.history = []
+        self.client._current_adventure = []
+
+    def _ok_response(self, response_text):
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.json.return_value = {"response": response_text}
+        return resp
 
     # ------------------------------------------------------------------
     # check_server
@@ -161,18 +187,12 @@ class TestMCADVTerminalClient(unittest.TestCase):
     # ------------------------------------------------------------------
 
     def test_send_message_returns_response_text(self):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "You are in a forest."}
-        mock_resp.raise_for_status = MagicMock()
-        with patch("requests.post", return_value=mock_resp):
+        with patch("requests.post", return_value=self._ok_response("You are in a forest.")):
             result = self.client._send_message("!start fantasy")
         self.assertEqual(result, "You are in a forest.")
 
     def test_send_message_uses_correct_endpoint(self):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "ok"}
-        mock_resp.raise_for_status = MagicMock()
-        with patch("requests.post", return_value=mock_resp) as mock_post:
+        with patch("requests.post", return_value=self._ok_response("ok")) as mock_post:
             self.client._send_message("hello")
         mock_post.assert_called_once()
         args, kwargs = mock_post.call_args
@@ -183,20 +203,14 @@ class TestMCADVTerminalClient(unittest.TestCase):
     # ------------------------------------------------------------------
 
     def test_start_adventure_sends_theme(self):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "Story begins..."}
-        mock_resp.raise_for_status = MagicMock()
-        with patch("requests.post", return_value=mock_resp) as mock_post:
+        with patch("requests.post", return_value=self._ok_response("Story begins...")) as mock_post:
             result = self.client.start_adventure("fantasy")
         self.assertEqual(result, "Story begins...")
         call_kwargs = mock_post.call_args[1]
         self.assertIn("!start fantasy", call_kwargs["json"]["content"])
 
     def test_make_choice_sends_number(self):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "You chose 2."}
-        mock_resp.raise_for_status = MagicMock()
-        with patch("requests.post", return_value=mock_resp) as mock_post:
+        with patch("requests.post", return_value=self._ok_response("You chose 2.")) as mock_post:
             result = self.client.make_choice(2)
         self.assertEqual(result, "You chose 2.")
         call_kwargs = mock_post.call_args[1]
@@ -206,31 +220,23 @@ class TestMCADVTerminalClient(unittest.TestCase):
     # _parse_response
     # ------------------------------------------------------------------
 
-    def test_parse_response_extracts_choices(self):
-        response = "You stand at a crossroads.\n1. Go north\n2. Go east\n3. Turn back\n"
-        story, choices = MCADVTerminalClient._parse_response(response)
-        self.assertIn("crossroads", story)
-        self.assertEqual(len(choices), 3)
-        self.assertEqual(choices[0], "Go north")
-        self.assertEqual(choices[1], "Go east")
-        self.assertEqual(choices[2], "Turn back")
-
-    def test_parse_response_no_choices(self):
-        response = "The adventure ends. You have won!"
-        story, choices = MCADVTerminalClient._parse_response(response)
-        self.assertEqual(story, response)
-        self.assertEqual(choices, [])
-
-    def test_parse_response_colon_separator(self):
-        response = "A fork in the road.\n1: Head left\n2: Head right"
-        story, choices = MCADVTerminalClient._parse_response(response)
-        self.assertEqual(len(choices), 2)
-
-    def test_parse_response_paren_separator(self):
-        response = "Choose your path:\n1) Duck\n2) Dodge"
-        story, choices = MCADVTerminalClient._parse_response(response)
-        self.assertEqual(len(choices), 2)
-        self.assertEqual(choices[0], "Duck")
+    PARSE_CASES = [
+        (
+            "You stand at a crossroads.\n1. Go north\n2. Go east\n3. Turn back\n",
+            "You stand at a crossroads.",
+            ["Go north", "Go east", "Turn back"],
+        ),
+        ("The adventure ends. You have won!", "The adventure ends. You have won!", []),
+        ("A fork in the road.\n1: Head left\n2: Head right", "A fork in the road.", ["Head left", "Head right"]),
+        ("Choose your path:\n1) Duck\n2) Dodge", "Choose your path:", ["Duck", "Dodge"]),
+    ]
+
+    def test_parse_response(self):
+        for response, expected_story, expected_choices in self.PARSE_CASES:
+            with self.subTest(response=response):
+                story, choices = MCADVTerminalClient._parse_response(response)
+                self.assertEqual(story, expected_story)
+                self.assertEqual(choices, expected_choices)
 
     # ------------------------------------------------------------------
     # list_themes
@@ -277,62 +283,32 @@ class TestMCADVTerminalClient(unittest.TestCase):
 class TestCLICommands(unittest.TestCase):
     """Tests for Click CLI commands."""
 
-    def _make_cli_runner(self):
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_health_success(self):
-        from click.testing import CliRunner
-
-        from terminal_client import cli
-
-        runner = CliRunner()
         with patch.object(MCADVTerminalClient, "check_server", return_value=True):
-            result = runner.invoke(cli, ["health"])
+            result = RUNNER.invoke(cli, ["health"])
         self.assertEqual(result.exit_code, 0)
         self.assertIn("healthy", result.output.lower())
 
     def test_health_failure(self):
-        from click.testing import CliRunner
-
-        from terminal_client import cli
-
-        runner = CliRunner()
         with patch.object(MCADVTerminalClient, "check_server", return_value=False):
-            result = runner.invoke(cli, ["health"])
+            result = RUNNER.invoke(cli, ["health"])
         self.assertNotEqual(result.exit_code, 0)
 
     def test_themes_lists_themes(self):
-        from click.testing import CliRunner
-
-        from terminal_client import cli
-
-        runner = CliRunner()
-        result = runner.invoke(cli, ["themes"])
+        result = RUNNER.invoke(cli, ["themes"])
         self.assertEqual(result.exit_code, 0)
         # At least one known theme should appear
         self.assertIn("fantasy", result.output.lower())
 
     def test_config_shows_current(self):
-        from click.testing import CliRunner
-
-        from terminal_client import cli
-
-        runner = CliRunner()
-        with patch("terminal_client.load_config", return_value=DEFAULT_CONFIG.copy()):
-            result = runner.invoke(cli, ["config"])
+        with patch("terminal_client.load_config", return_value=FROZEN_DEFAULT_CONFIG):
+            result = RUNNER.invoke(cli, ["config"])
         self.assertEqual(result.exit_code, 0)
         self.assertIn("server_url", result.output)
 
     def test_history_no_history(self):
-        from click.testing import CliRunner
-
-        from terminal_client import cli
-
-        runner = CliRunner()
         with patch("terminal_client.load_history", return_value=[]):
-            result = runner.invoke(cli, ["history"])
+            result = RUNNER.invoke(cli, ["history"])
         self.assertEqual(result.exit_code, 0)
         self.assertIn("No saved", result.output)
 
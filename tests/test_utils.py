@@ -2,15 +2,11 @@
 Test utilities – factories and helpers shared across test modules.
 """
 
-import os
-import sys
 import time
 from unittest.mock import MagicMock
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from adventure_bot import AdventureBot  # noqa: E402
-from meshcore import MeshCoreMessage  # noqa: E402
+from adventure_bot import AdventureBot
+from meshcore import MeshCoreMessage
 
 
 class MessageFactory:
@@ -42,13 +38,16 @@ class SessionFactory:
         theme: str = "fantasy",
         node: str = "start",
         history=None,
+        last_active=None,
     ) -> dict:
+        # Default to now: a fixed past timestamp would make the session
+        # expire on the bot's next _expire_sessions() pass
         return {
             "status": status,
             "theme": theme,
             "node": node,
             "history": history if history is not None else [],
-            "last_active": time.time(),
+            "last_active": last_active if last_active is not None else time.time(),
         }
 
 
@@ -68,7 +67,7 @@ class BotFactory:
         bot = AdventureBot(**defaults)
         bot._sessions = {}
         bot._save_sessions = MagicMock()
-        bot._call_ollama = MagicMock(return_value=None)
+        bot._call_ollama = stub_llm()
         return bot
 
 
@@ -77,6 +76,23 @@ class BotFactory:
 # ---------------------------------------------------------------------------
 
 
+def stub_llm(result=None):
+    """
+    Return a cheap stand-in for AdventureBot._call_ollama.
+
+    The stub always returns *result* and counts its calls in
+    ``stub.call_count``, which is all the tests ever inspect; it skips
+    MagicMock's per-call bookkeeping.
+    """
+
+    def stub(*args, **kwargs):
+        stub.call_count += 1
+        return result
+
+    stub.call_count = 0
+    return stub
+
+
 def make_test_message(
     sender: str = "TestUser",
     content: str = "!adv",
@@ -6,14 +6,11 @@ Tests all new /api/adventure/* and /api/themes endpoints, session management,
 error handling, and isolation from mesh sessions.
 """
 
-import os
-import sys
+import copy
 import unittest
-from unittest.mock import MagicMock
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from adventure_bot import VALID_THEMES, AdventureBot, _is_valid_uuid  # noqa: E402
+from adventure_bot import VALID_THEMES, AdventureBot, _is_valid_uuid
+from tests.test_utils import stub_llm
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -34,11 +31,20 @@ def make_bot(**kwargs) -> AdventureBot:
     defaults.update(kwargs)
     bot = AdventureBot(**defaults)
     bot._sessions = {}
-    bot._save_sessions = MagicMock()
-    bot._call_ollama = MagicMock(return_value=None)
+    # Nothing here inspects saves; a plain no-op is cheaper than any mock
+    bot._save_sessions = lambda force=False: None
+    bot._call_ollama = stub_llm()
     return bot
 
 
+def reset_sessions(bot: AdventureBot, sessions: dict) -> None:
+    """Restore a shared bot's session state to fresh copies of *sessions*."""
+    bot._sessions = copy.deepcopy(sessions)
+    bot._rebuild_expiry_heap()
+    bot._quit_votes = {}
+    bot._sessions_dirty = False
+
+
 # ---------------------------------------------------------------------------
 # UUID helper
 # ---------------------------------------------------------------------------
@@ -57,6 +63,12 @@ class TestIsValidUUID(unittest.TestCase):
     def test_valid_uppercase(self):
         self.assertTrue(_is_valid_uuid(VALID_UUID.upper()))
 
+    def test_invalid_trailing_newline(self):
+        self.assertFalse(_is_valid_uuid(VALID_UUID + "\n"))
+
+    def test_invalid_non_string(self):
+        self.assertFalse(_is_valid_uuid(12345678))
+
 
 # ---------------------------------------------------------------------------
 # Session key helpers
@@ -64,8 +76,10 @@ class TestIsValidUUID(unittest.TestCase):
 
 
 class TestWebSessionKey(unittest.TestCase):
-    def setUp(self):
-        self.bot = make_bot()
+    @classmethod
+    def setUpClass(cls):
+        # Key helpers are pure, so one bot serves the whole class
+        cls.bot = make_bot()
 
     def test_web_session_key_format(self):
         key = self.bot._session_key_web(VALID_UUID)
@@ -90,9 +104,11 @@ class TestWebSessionKey(unittest.TestCase):
 
 
 class TestThemesEndpoint(unittest.TestCase):
-    def setUp(self):
-        self.bot = make_bot()
-        self.client = self.bot.app.test_client()
+    @classmethod
+    def setUpClass(cls):
+        # Read-only endpoint: share one bot and client across the class
+        cls.bot = make_bot()
+        cls.client = cls.bot.app.test_client()
 
     def test_returns_200(self):
         resp = self.client.get("/api/themes")
@@ -111,9 +127,11 @@ class TestThemesEndpoint(unittest.TestCase):
 
 
 class TestHealthEndpoint(unittest.TestCase):
-    def setUp(self):
-        self.bot = make_bot()
-        self.client = self.bot.app.test_client()
+    @classmethod
+    def setUpClass(cls):
+        # Read-only endpoint: share one bot and client across the class
+        cls.bot = make_bot()
+        cls.client = cls.bot.app.test_client()
 
     def test_health_returns_mode(self):
         resp = self.client.get("/api/health")
@@ -198,15 +216,20 @@ class TestAdventureStart(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 
+ACTIVE_WEB_SESSIONS = {
+    f"web_{VALID_UUID}": {"status": "active", "theme": "fantasy", "node": "start", "history": []},
+}
+
+
 class TestAdventureChoice(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.bot = make_bot()
+        cls.client = cls.bot.app.test_client()
+
     def setUp(self):
-        self.bot = make_bot()
-        self.client = self.bot.app.test_client()
         # Pre-create an active session
-        self.bot._update_session(
-            f"web_{VALID_UUID}",
-            {"status": "active", "theme": "fantasy", "node": "start", "history": []},
-        )
+        reset_sessions(self.bot, ACTIVE_WEB_SESSIONS)
 
     def _choice(self, payload):
         return self.client.post(
@@ -306,13 +329,13 @@ class TestAdventureStatus(unittest.TestCase):
 
 
 class TestAdventureQuit(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.bot = make_bot()
+        cls.client = cls.bot.app.test_client()
+
     def setUp(self):
-        self.bot = make_bot()
-        self.client = self.bot.app.test_client()
-        self.bot._update_session(
-            f"web_{VALID_UUID}",
-            {"status": "active", "theme": "fantasy", "node": "start", "history": []},
-        )
+        reset_sessions(self.bot, ACTIVE_WEB_SESSIONS)
 
     def _quit(self, payload):
         return self.client.post(
@@ -1,7 +1,6 @@
-import hashlib
 import time
 from collections import OrderedDict
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class ResponseCache:
@@ -11,28 +10,47 @@ class ResponseCache:
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
         self._cache: OrderedDict = OrderedDict()
+        self._oldest_ts = float("inf")
 
-    def _key(self, *parts: str) -> str:
-        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+    def _key(self, *parts: str) -> Tuple[str, ...]:
+        # The parts tuple is the dict key itself: hashed natively, and unlike
+        # a joined string, ("a|b", "c") and ("a", "b|c") stay distinct
+        return parts
 
-    def _evict_expired(self) -> None:
-        now = time.time()
-        expired = [k for k, (_, ts) in self._cache.items() if now - ts > self.ttl_seconds]
-        for k in expired:
-            del self._cache[k]
+    def _evict_expired(self, now: float) -> None:
+        # Writes append in timestamp order, so expired entries collect at the
+        # head: pop until the oldest remaining entry is still fresh. An entry
+        # a read moved to the tail keeps its old timestamp and is dropped by
+        # _get or the size bound instead. _oldest_ts remembers the head's
+        # timestamp, so most calls return before touching the dict.
+        cutoff = now - self.ttl_seconds
+        if self._oldest_ts >= cutoff:
+            return
+        cache = self._cache
+        while cache:
+            _, ts = next(iter(cache.values()))
+            if ts >= cutoff:
+                self._oldest_ts = ts
+                return
+            cache.popitem(last=False)
+        self._oldest_ts = float("inf")
 
-    def _set(self, key: str, value) -> None:
-        self._evict_expired()
+    def _set(self, key: Tuple[str, ...], value) -> None:
+        now = time.time()
+        self._evict_expired(now)
         if key in self._cache:
             self._cache.move_to_end(key)
-        self._cache[key] = (value, time.time())
+        self._cache[key] = (value, now)
+        if now < self._oldest_ts:
+            self._oldest_ts = now
         while len(self._cache) > self.max_size:
             self._cache.popitem(last=False)
 
-    def _get(self, key: str) -> Optional[object]:
-        if key not in self._cache:
+    def _get(self, key: Tuple[str, ...]) -> Optional[object]:
+        entry = self._cache.get(key)
+        if entry is None:
             return None
-        value, ts = self._cache[key]
+        value, ts = entry
         if time.time() - ts > self.ttl_seconds:
             del self._cache[key]
             return None
@@ -53,6 +71,7 @@ class ResponseCache:
 
     def clear(self) -> None:
         self._cache.clear()
+        self._oldest_ts = float("inf")
 
     def size(self) -> int:
         return len(self._cache)
@@ -1,4 +1,9 @@
-from typing import List
+from typing import List, Optional, Tuple
+
+# A chunk is ended early at a sentence boundary only if it keeps at least
+# this share of the text it would otherwise have held
+_MIN_SENTENCE_FILL = 0.6
+_SENTENCE_ENDS = ".!?"
 
 
 def chunk_message(text: str, max_len: int = 230) -> List[str]:
@@ -14,24 +19,14 @@ def chunk_message(text: str, max_len: int = 230) -> List[str]:
 
     # Split into words while keeping trailing spaces attached
     words = text.split(" ")
-    raw_chunks: List[str] = []
-    current = ""
-
-    for word in words:
-        candidate = (current + " " + word).strip() if current else word
-        if len(candidate) <= max_len:
-            current = candidate
-        else:
-            if current:
-                raw_chunks.append(current)
-            # If a single word exceeds max_len, force-split it
-            while len(word) > max_len:
-                raw_chunks.append(word[:max_len])
-                word = word[max_len:]
-            current = word
-
-    if current:
-        raw_chunks.append(current)
+    raw_chunks = None
+    # Common case: single-spaced text with no other whitespace (isprintable()
+    # is False for newlines, tabs and non-ASCII spaces), so no word is empty
+    # or needs stripping
+    if text.isprintable() and "  " not in text and text[0] != " " and text[-1] != " ":
+        raw_chunks = _pack_plain_words(words, max_len)
+    if raw_chunks is None:
+        raw_chunks = _pack_words(words, max_len)
 
     if len(raw_chunks) == 1:
         return raw_chunks
@@ -50,3 +45,92 @@ def chunk_message(text: str, max_len: int = 230) -> List[str]:
             result.append(prefix + trimmed)
 
     return result
+
+
+def _pack_plain_words(words: List[str], max_len: int) -> Optional[List[str]]:
+    """
+    Greedily pack words into chunks of at most *max_len* characters.
+
+    Fast path of chunk_message for non-empty, whitespace-free words: only
+    lengths are tracked, and each chunk string is built once from a slice of
+    *words*. Returns None if a word is longer than *max_len* and needs the
+    force-split in _pack_words.
+    """
+    chunks: List[str] = []
+    start = 0
+    length = -1  # length of " ".join(words[start:i]); -1 for an empty chunk
+    for i, word in enumerate(words):
+        if length + 1 + len(word) <= max_len:
+            length += 1 + len(word)
+            continue
+        if len(word) > max_len:
+            return None
+        end = _last_sentence_end(words, start, i, length, max_len - 1 - len(word))
+        chunks.append(" ".join(words[start:end]))
+        start, length = end, sum(map(len, words[end : i + 1])) + i - end
+    chunks.append(" ".join(words[start:]))
+    return chunks
+
+
+def _pack_words(words: List[str], max_len: int) -> List[str]:
+    """General word packing for chunk_message (odd spacing, oversized words)."""
+    raw_chunks: List[str] = []
+    current = ""
+
+    for word in words:
+        candidate = (current + " " + word).strip() if current else word
+        if len(candidate) <= max_len:
+            current = candidate
+        else:
+            if current:
+                head, tail = _split_last_sentence(current, max_len - 1 - len(word))
+                raw_chunks.append(head)
+                if tail:
+                    word = tail + " " + word
+            # If a single word exceeds max_len, force-split it by offset
+            # rather than re-slicing the shrinking remainder each time
+            if len(word) > max_len:
+                cuts = range(0, len(word) - max_len, max_len)
+                raw_chunks.extend(word[i : i + max_len] for i in cuts)
+                word = word[len(cuts) * max_len :]
+            current = word
+
+    if current:
+        raw_chunks.append(current)
+
+    return raw_chunks
+
+
+def _last_sentence_end(words: List[str], start: int, stop: int, length: int, max_tail: int) -> int:
+    """
+    Return where the chunk words[start:stop] should end: just after its last
+    sentence-ending word, or *stop* to keep the whole chunk.
+
+    *length* is the joined length of the chunk. The cut is only taken if the
+    head keeps _MIN_SENTENCE_FILL of it and the carried-over words are at most
+    *max_tail* characters long. Mirrors _split_last_sentence word by word.
+    """
+    tail = -1
+    for j in range(stop - 1, start, -1):
+        tail += 1 + len(words[j])
+        if tail > max_tail or length - tail - 1 < length * _MIN_SENTENCE_FILL:
+            break
+        if words[j - 1][-1] in _SENTENCE_ENDS:
+            return j
+    return stop
+
+
+def _split_last_sentence(chunk: str, max_tail: int) -> Tuple[str, str]:
+    """
+    Split *chunk* after its last sentence end into (head, carried-over tail).
+
+    Returns (chunk, "") when there is no sentence end, the head would keep less
+    than _MIN_SENTENCE_FILL of the chunk, or the tail is longer than *max_tail*.
+    """
+    cut = max(chunk.rfind(end + " ") for end in _SENTENCE_ENDS)
+    if cut < 0:
+        return chunk, ""
+    head, tail = chunk[: cut + 1], chunk[cut + 2 :]
+    if len(tail) > max_tail or len(head) < len(chunk) * _MIN_SENTENCE_FILL:
+        return chunk, ""
+    return head, tail
@@ -6,6 +6,8 @@ from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 
 class Config:
     """Hierarchical configuration with dot-notation access and env-var overrides."""
@@ -28,10 +30,19 @@ class Config:
         "features": {"story_saves": True, "web_dashboard": True, "llm_generation": True},
     }
 
-    def __init__(self, config_path: Optional[Path] = None):
-        import copy
+    # Environment variable -> (section, key) it overrides in from_env()
+    _ENV_OVERRIDES = (
+        ("BOT_HOST", "server", "host"),
+        ("BOT_PORT", "server", "port"),
+        ("BOT_DEBUG", "server", "debug"),
+        ("OLLAMA_URL", "llm", "url"),
+        ("OLLAMA_MODEL", "llm", "model"),
+        ("RADIO_PORT", "radio", "port"),
+        ("RADIO_BAUD", "radio", "baud"),
+    )
 
-        self._data: Dict[str, Any] = copy.deepcopy(self.DEFAULTS)
+    def __init__(self, config_path: Optional[Path] = None):
+        self._data: Dict[str, Any] = json.loads(_DEFAULTS_JSON)
         if config_path and Path(config_path).exists():
             try:
                 with open(config_path) as fh:
@@ -39,49 +50,55 @@ class Config:
                 self._merge(self._data, loaded)
             except (OSError, json.JSONDecodeError, ValueError) as e:
                 logger.warning(f"Failed to load config from {config_path}: {e}. Using defaults.")
+        self._build_index()
+
+    def _build_index(self) -> None:
+        """Map every dot-notation path to its value so get() is one dict lookup."""
+        self._flat: Dict[str, Any] = {}
+        stack = [("", self._data)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                path = f"{prefix}{key}"
+                self._flat[path] = value
+                if isinstance(value, dict):
+                    stack.append((path + ".", value))
 
     def _merge(self, base: dict, override: dict) -> None:
-        for key, value in override.items():
-            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                self._merge(base[key], value)
-            else:
-                base[key] = value
+        stack = [(base, override)]
+        while stack:
+            base, override = stack.pop()
+            for key, value in override.items():
+                current = base.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    stack.append((current, value))
+                else:
+                    base[key] = value
 
     def get(self, key: str, default: Any = None) -> Any:
         """Retrieve a value using dot notation, e.g. 'server.port'."""
-        parts = key.split(".")
-        node: Any = self._data
-        for part in parts:
-            if isinstance(node, dict) and part in node:
-                node = node[part]
-            else:
-                return default
-        return node
+        value = self._flat.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        # Sections are handed out as copies: the dotted-path index would not
+        # see a caller's changes to the live nested dict
+        return json.loads(json.dumps(value)) if isinstance(value, dict) else value
 
     def get_all(self) -> Dict:
-        import copy
-
-        return copy.deepcopy(self._data)
+        # Config values are plain JSON, so a dumps/loads round-trip is a
+        # faster deep copy than copy.deepcopy
+        return json.loads(json.dumps(self._data))
 
     @classmethod
     def from_env(cls) -> "Config":
         """Build a Config whose values can be overridden by environment variables."""
         instance = cls()
-        mapping = {
-            "BOT_HOST": "server.host",
-            "BOT_PORT": "server.port",
-            "BOT_DEBUG": "server.debug",
-            "OLLAMA_URL": "llm.url",
-            "OLLAMA_MODEL": "llm.model",
-            "RADIO_PORT": "radio.port",
-            "RADIO_BAUD": "radio.baud",
-        }
-        for env_var, dot_key in mapping.items():
+        for env_var, section, key in cls._ENV_OVERRIDES:
             val = os.environ.get(env_var)
             if val is not None:
-                parts = dot_key.split(".")
-                node = instance._data
-                for part in parts[:-1]:
-                    node = node.setdefault(part, {})
-                node[parts[-1]] = val
+                instance._data.setdefault(section, {})[key] = val
+        instance._build_index()
         return instance
+
+
+_DEFAULTS_JSON = json.dumps(Config.DEFAULTS)
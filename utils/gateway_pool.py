@@ -1,9 +1,14 @@
 import threading
 import time
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# Upper bound on concurrent health probes
+MAX_PROBE_WORKERS = 16
 
 try:
     import requests as _requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     _requests = None  # type: ignore[assignment]
 
@@ -12,53 +17,82 @@ class GatewayPool:
     """Thread-safe pool of bot-server gateway URLs with health tracking."""
 
     def __init__(self):
-        self._gateways: List[dict] = []
+        # Gateways are stored as parallel lists addressed through a url -> index
+        # map, so mark_* are O(1) and health scans walk one flat list
+        self._index: Dict[str, int] = {}
+        self._urls: List[str] = []
+        self._healthy: List[bool] = []
+        self._last_check: List[float] = []
         self._lock = threading.Lock()
+        # Shared keep-alive session for health probes, one pooled connection
+        # per gateway host so repeated checks skip the TCP handshake
+        self._session = None
+        if _requests is not None:
+            self._session = _requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_PROBE_WORKERS, pool_maxsize=MAX_PROBE_WORKERS, max_retries=0)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
 
     def add_gateway(self, url: str) -> None:
         """Register a gateway URL (idempotent)."""
         with self._lock:
-            urls = [g["url"] for g in self._gateways]
-            if url not in urls:
-                self._gateways.append({"url": url, "healthy": True, "last_check": 0.0})
+            if url not in self._index:
+                self._index[url] = len(self._urls)
+                self._urls.append(url)
+                self._healthy.append(True)
+                self._last_check.append(0.0)
 
     def get_healthy_gateway(self) -> Optional[str]:
         """Return the URL of the first healthy gateway, or None."""
         with self._lock:
-            for gw in self._gateways:
-                if gw["healthy"]:
-                    return gw["url"]
-        return None
+            try:
+                return self._urls[self._healthy.index(True)]
+            except ValueError:
+                return None
 
     def health_check_all(self) -> None:
         """Probe every registered gateway and update its health status."""
         with self._lock:
-            gateways = list(self._gateways)
-        for gw in gateways:
-            healthy = self._probe(gw["url"])
-            with self._lock:
-                for g in self._gateways:
-                    if g["url"] == gw["url"]:
-                        g["healthy"] = healthy
-                        g["last_check"] = time.time()
+            urls = list(self._urls)
+        if not urls:
+            return
+        # Probes are pure network waits, so run them side by side: the whole
+        # check takes about one probe timeout rather than one per gateway
+        if len(urls) == 1:
+            results = {urls[0]: self._probe(urls[0])}
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(urls), MAX_PROBE_WORKERS)) as executor:
+                results = dict(zip(urls, executor.map(self._probe, urls)))
+        now = time.time()
+        with self._lock:
+            for url, healthy in results.items():
+                idx = self._index.get(url)
+                if idx is not None:
+                    self._healthy[idx] = healthy
+                    self._last_check[idx] = now
 
     def _probe(self, url: str) -> bool:
-        if _requests is None:
+        if self._session is None:
             return False
         try:
-            resp = _requests.get(f"{url}/api/health", timeout=5)
+            resp = self._session.get(f"{url}/api/health", timeout=5)
             return resp.status_code == 200
         except Exception:
             return False
 
     def mark_unhealthy(self, url: str) -> None:
-        with self._lock:
-            for gw in self._gateways:
-                if gw["url"] == url:
-                    gw["healthy"] = False
+        self._set_health(url, False)
 
     def mark_healthy(self, url: str) -> None:
+        self._set_health(url, True)
+
+    def _set_health(self, url: str, healthy: bool) -> None:
         with self._lock:
-            for gw in self._gateways:
-                if gw["url"] == url:
-                    gw["healthy"] = True
+            idx = self._index.get(url)
+            if idx is not None:
+                self._healthy[idx] = healthy
+
+    def close(self) -> None:
+        """Close pooled probe connections."""
+        if self._session is not None:
+            self._session.close()
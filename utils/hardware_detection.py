@@ -5,6 +5,7 @@ Detects whether this device is a bot server (Pi 4/5 or Ubuntu Desktop)
 or a radio gateway (Pi Zero 2W).
 """
 
+import functools
 import os
 import platform
 import subprocess
@@ -20,11 +21,15 @@ def _read_file(path: str) -> Optional[str]:
         return None
 
 
+# The board model, OS and RAM size cannot change while the process runs, so
+# their probes are cached. Process checks are not: they can change any time.
+@functools.lru_cache(maxsize=None)
 def _get_pi_model() -> Optional[str]:
     """Return Raspberry Pi model string from /proc/device-tree/model, or None."""
     return _read_file("/proc/device-tree/model")
 
 
+@functools.lru_cache(maxsize=None)
 def _is_ubuntu_desktop() -> bool:
     """Return True if this looks like an Ubuntu Desktop system."""
     if platform.system() != "Linux":
@@ -35,6 +40,8 @@ def _is_ubuntu_desktop() -> bool:
 
 def _process_running(name: str) -> bool:
     """Return True if a process matching *name* is currently running."""
+    if os.path.isdir("/proc/self"):
+        return _proc_cmdline_contains(name.encode())
     try:
         result = subprocess.run(
             ["pgrep", "-f", name],
@@ -46,6 +53,44 @@ def _process_running(name: str) -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=None)
+def _total_ram_mb() -> int:
+    """Return total RAM in MB from /proc/meminfo, or 0 if unknown."""
+    meminfo = _read_file("/proc/meminfo")
+    if meminfo:
+        for line in meminfo.splitlines():
+            if line.startswith("MemTotal:"):
+                parts = line.split()
+                if len(parts) >= 2:
+                    try:
+                        return int(parts[1]) // 1024
+                    except ValueError:
+                        pass
+                break
+    return 0
+
+
+def _proc_cmdline_contains(needle: bytes) -> bool:
+    """Scan /proc/<pid>/cmdline for *needle*; Linux stand-in for ``pgrep -f``."""
+    try:
+        entries = os.scandir("/proc")
+    except OSError:
+        return False
+    with entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry.name}/cmdline", "rb") as fh:
+                    # Arguments are NUL-separated; pgrep -f matches them space-joined
+                    if needle in fh.read().replace(b"\0", b" "):
+                        return True
+            except OSError:
+                # The process exited or is not readable
+                continue
+    return False
+
+
 def detect_hardware_role() -> str:
     """
     Detect if this device is a bot server or radio gateway.
@@ -102,20 +147,6 @@ def get_hardware_info() -> Dict[str, object]:
     elif _is_ubuntu_desktop():
         hw_platform = "ubuntu_desktop"
 
-    # RAM
-    ram_mb = 0
-    meminfo = _read_file("/proc/meminfo")
-    if meminfo:
-        for line in meminfo.splitlines():
-            if line.startswith("MemTotal:"):
-                parts = line.split()
-                if len(parts) >= 2:
-                    try:
-                        ram_mb = int(parts[1]) // 1024
-                    except ValueError:
-                        pass
-                break
-
     # CPU count
     try:
         cpu_count = os.cpu_count() or 0
@@ -125,7 +156,7 @@ def get_hardware_info() -> Dict[str, object]:
     return {
         "platform": hw_platform,
         "role": detect_hardware_role(),
-        "ram_mb": ram_mb,
+        "ram_mb": _total_ram_mb(),
         "cpu_count": cpu_count,
     }
 
@@ -1,39 +1,106 @@
+import os
 import threading
 import time
-import uuid
-from typing import Dict
+from typing import Dict, List
+
+# The dedup window is split into this many generations, plus one for the
+# generation currently being filled
+_GENERATIONS_PER_WINDOW = 3
+
+# generate_id draws its random bytes from a per-thread buffer refilled with
+# one os.urandom call per 4096 IDs
+_RANDOM_BUFFER_SIZE = 16 * 4096
+_UUID_VARIANT_DIGITS = "89ab"  # RFC 4122 variant: top two bits of the digit are 10
+_random_buffers = threading.local()
+
+
+def _reset_random_buffers() -> None:
+    # A forked child must not hand out the IDs still buffered in its parent
+    global _random_buffers
+    _random_buffers = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_random_buffers)
 
 
 class MessageTracker:
-    """Deduplicates messages using a sliding-window of recently seen IDs."""
+    """
+    Deduplicates messages using a sliding-window of recently seen IDs.
+
+    Seen IDs live in a short list of generation dicts, newest first, each
+    covering 1/_GENERATIONS_PER_WINDOW of the window. Once a generation is
+    entirely older than the window it is dropped as a whole, so memory stays
+    bounded by the traffic in one window without any scan over the IDs.
+    """
 
     def __init__(self, dedup_window_seconds: int = 60):
         self.dedup_window_seconds = dedup_window_seconds
-        self._seen: Dict[str, float] = {}  # message_id -> timestamp
+        self._generation_seconds = dedup_window_seconds / _GENERATIONS_PER_WINDOW
+        # Newest generation first, each message_id -> timestamp. The list is
+        # replaced rather than mutated on rotation, so readers need no lock.
+        self._generations: List[Dict[str, float]] = [{}]
+        self._generation_start = time.time()
         self._lock = threading.Lock()
 
     def generate_id(self) -> str:
         """Return a new UUID4 string."""
-        return str(uuid.uuid4())
+        buffers = _random_buffers
+        offset = getattr(buffers, "offset", _RANDOM_BUFFER_SIZE)
+        if offset >= _RANDOM_BUFFER_SIZE:
+            buffers.data = os.urandom(_RANDOM_BUFFER_SIZE)
+            offset = 0
+        buffers.offset = offset + 16
+        h = buffers.data[offset : offset + 16].hex()
+        # Same text as str(uuid.uuid4()): version digit 4, variant bits 10
+        return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{_UUID_VARIANT_DIGITS[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
 
     def is_duplicate(self, message_id: str) -> bool:
         """Return True if *message_id* was seen within the dedup window."""
-        now = time.time()
-        cutoff = now - self.dedup_window_seconds
-        with self._lock:
-            ts = self._seen.get(message_id)
-            return ts is not None and ts >= cutoff
+        cutoff = time.time() - self.dedup_window_seconds
+        # Lock-free: one attribute read gives a consistent list of
+        # generations, and dict.get is atomic under the GIL
+        for generation in self._generations:
+            ts = generation.get(message_id)
+            if ts is not None:
+                return ts >= cutoff
+        return False
 
     def track(self, message_id: str) -> None:
         """Record *message_id* as seen."""
-        with self._lock:
-            self._seen[message_id] = time.time()
+        now = time.time()
+        # Only rotation needs the lock; storing into the current generation
+        # is a single atomic dict write. A write racing a rotation lands in
+        # what just became the second generation, which is still searched.
+        if now - self._generation_start >= self._generation_seconds:
+            with self._lock:
+                self._rotate(now)
+        self._generations[0][message_id] = now
 
     def cleanup_expired(self) -> int:
         """Remove entries outside the dedup window; return count removed."""
-        cutoff = time.time() - self.dedup_window_seconds
+        now = time.time()
+        cutoff = now - self.dedup_window_seconds
         with self._lock:
-            expired = [mid for mid, ts in self._seen.items() if ts < cutoff]
-            for mid in expired:
-                del self._seen[mid]
-        return len(expired)
+            removed = self._rotate(now)
+            # Only the oldest of a full set of generations can straddle the
+            # cutoff, and track() never writes to it
+            generations = self._generations
+            if len(generations) > _GENERATIONS_PER_WINDOW:
+                oldest = generations[-1]
+                fresh = {mid: ts for mid, ts in oldest.items() if ts >= cutoff}
+                removed += len(oldest) - len(fresh)
+                self._generations = generations[:-1] + [fresh]
+        return removed
+
+    def _rotate(self, now: float) -> int:
+        """Start generations up to *now*, dropping expired ones; return the IDs dropped. Needs _lock."""
+        span = self._generation_seconds
+        elapsed = int((now - self._generation_start) // span) if span > 0 else 1
+        if elapsed <= 0:
+            return 0
+        keep = _GENERATIONS_PER_WINDOW + 1
+        generations = [{} for _ in range(min(elapsed, keep))] + self._generations
+        self._generations = generations[:keep]
+        self._generation_start = now if span <= 0 else self._generation_start + elapsed * span
+        return sum(map(len, generations[keep:]))
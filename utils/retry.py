@@ -1,46 +1,150 @@
+import asyncio
 import functools
+import inspect
 import logging
+import random
 import time
-from typing import Callable, Tuple, Type
+from typing import Callable, Dict, Iterator, Tuple, Type
 
 logger = logging.getLogger(__name__)
 
+# Back-off delay -> time actually slept, per retry_with_backoff(jitter=...)
+_JITTERS: Dict[str, Callable[[float], float]] = {
+    "full": lambda delay: random.uniform(0, delay),
+    "equal": lambda delay: delay / 2 + random.uniform(0, delay / 2),
+    "none": lambda delay: delay,
+}
+
+
+def _jitter(jitter: str) -> Callable[[float], float]:
+    if jitter not in _JITTERS:
+        raise ValueError(f"jitter must be one of {', '.join(_JITTERS)}, got {jitter!r}")
+    return _JITTERS[jitter]
+
+
+def _sleep_times(
+    sleep_time: Callable[[float], float], base_delay: float, backoff_factor: float, max_delay: float
+) -> Iterator[float]:
+    """Yield the jittered sleep before each successive retry."""
+    delay = base_delay
+    while True:
+        yield sleep_time(delay)
+        delay = min(delay * backoff_factor, max_delay)
+
+
+def _log_retry(func: Callable, attempt: int, max_attempts: int, exc: Exception, sleep_for: float) -> None:
+    # Check the level up front so muted retry logging skips the __name__
+    # lookup and argument packing on every failed attempt
+    if not logger.isEnabledFor(logging.WARNING):
+        return
+    logger.warning(
+        "Attempt %d/%d for %s failed: %s – retrying in %.1fs",
+        attempt,
+        max_attempts,
+        func.__name__,
+        exc,
+        sleep_for,
+    )
+
+
+def _log_give_up(func: Callable, max_attempts: int, exc: Exception) -> None:
+    if not logger.isEnabledFor(logging.ERROR):
+        return
+    logger.error(
+        "All %d attempts for %s failed: %s",
+        max_attempts,
+        func.__name__,
+        exc,
+    )
+
 
 def retry_with_backoff(
     max_attempts: int = 3,
     backoff_factor: float = 2.0,
     exceptions: Tuple[Type[Exception], ...] = (Exception,),
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    jitter: str = "full",
 ) -> Callable:
-    """Decorator that retries a function with exponential back-off on failure."""
+    """
+    Decorator that retries a function with exponential back-off on failure.
+
+    The back-off starts at *base_delay* and grows by *backoff_factor* up to
+    *max_delay*. *jitter* picks how long to actually sleep for a back-off
+    of ``d``, so that callers failing together do not retry in lockstep:
+    ``"full"`` sleeps a random time in [0, d], ``"equal"`` in [d/2, d] and
+    ``"none"`` exactly d.
+    """
+    sleep_time = _jitter(jitter)
+    # Built once per decorator. The back-off generator is only created after
+    # a failure, so a call that succeeds first time never builds it.
+    attempts = range(1, max_attempts + 1)
 
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            delay = 1.0
+            sleeps = None
             last_exc = None
-            for attempt in range(1, max_attempts + 1):
+            for attempt in attempts:
                 try:
                     return func(*args, **kwargs)
                 except exceptions as exc:
                     last_exc = exc
                     if attempt < max_attempts:
-                        logger.warning(
-                            "Attempt %d/%d for %s failed: %s – retrying in %.1fs",
-                            attempt,
-                            max_attempts,
-                            func.__name__,
-                            exc,
-                            delay,
-                        )
-                        time.sleep(delay)
-                        delay *= backoff_factor
+                        if sleeps is None:
+                            sleeps = _sleep_times(sleep_time, base_delay, backoff_factor, max_delay)
+                        sleep_for = next(sleeps)
+                        _log_retry(func, attempt, max_attempts, exc, sleep_for)
+                        time.sleep(sleep_for)
+                    else:
+                        _log_give_up(func, max_attempts, exc)
+            raise last_exc  # type: ignore[misc]
+
+        return wrapper
+
+    return decorator
+
+
+def async_retry_with_backoff(
+    max_attempts: int = 3,
+    backoff_factor: float = 2.0,
+    exceptions: Tuple[Type[Exception], ...] = (Exception,),
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    jitter: str = "full",
+) -> Callable:
+    """
+    Coroutine version of retry_with_backoff, with the same options.
+
+    The back-off waits with ``asyncio.sleep``, so a retrying call holds no
+    thread and leaves the event loop free for other tasks.
+    """
+    sleep_time = _jitter(jitter)
+    # Built once per decorator. The back-off generator is only created after
+    # a failure, so a call that succeeds first time never builds it.
+    attempts = range(1, max_attempts + 1)
+
+    def decorator(func: Callable) -> Callable:
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError(f"async_retry_with_backoff needs a coroutine function, got {func!r}")
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            sleeps = None
+            last_exc = None
+            for attempt in attempts:
+                try:
+                    return await func(*args, **kwargs)
+                except exceptions as exc:
+                    last_exc = exc
+                    if attempt < max_attempts:
+                        if sleeps is None:
+                            sleeps = _sleep_times(sleep_time, base_delay, backoff_factor, max_delay)
+                        sleep_for = next(sleeps)
+                        _log_retry(func, attempt, max_attempts, exc, sleep_for)
+                        await asyncio.sleep(sleep_for)
                     else:
-                        logger.error(
-                            "All %d attempts for %s failed: %s",
-                            max_attempts,
-                            func.__name__,
-                            exc,
-                        )
+                        _log_give_up(func, max_attempts, exc)
             raise last_exc  # type: ignore[misc]
 
         return wrapper
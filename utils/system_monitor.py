@@ -5,9 +5,22 @@ Provides CPU temperature, throttle detection, power-draw estimation,
 and optional battery-level queries.
 """
 
+import logging
 import os
+import re
 import subprocess
-from typing import Optional
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# vcgencmd output, e.g. "temp=48.3'C" and "throttled=0x50000". Only the low
+# nibble of the throttle mask matters, so the patterns capture just the last
+# hex digit instead of parsing the whole value.
+_TEMP_RE = re.compile(r"temp=(-?[0-9]+(?:\.[0-9]+)?)")
+_THROTTLE_HEX = r"(?:0x)?[0-9a-fA-F]*([0-9a-fA-F])"
+_THROTTLE_RE = re.compile("throttled=" + _THROTTLE_HEX)
+_THROTTLE_SYSFS_RE = re.compile(_THROTTLE_HEX)
 
 
 class SystemMonitor:
@@ -25,25 +38,147 @@ class SystemMonitor:
         "/sys/class/power_supply/battery/capacity",
     ]
 
+    # Longest sysfs attribute value we read (a few digits or a hex word)
+    _SYSFS_READ_SIZE = 64
+    # A sysfs path that is this slow for several reads in a row is left
+    # alone for a while rather than stalling every tick
+    _SLOW_READ_SECONDS = 0.05
+    _SLOW_READS_BEFORE_SKIP = 3
+    _SLOW_PATH_SKIP_SECONDS = 600.0
+
+    # How long _run reuses a command's output: briefly for a result, longer
+    # for a command that failed, and much longer for one that is not installed
+    _RUN_CACHE_SECONDS = 1.0
+    _FAILED_RUN_CACHE_SECONDS = 60.0
+    _MISSING_COMMAND_CACHE_SECONDS = 3600.0
+
+    def __init__(self) -> None:
+        # sysfs path -> descriptor kept open and re-read in place each call
+        self._fds: Dict[str, int] = {}
+        # Consecutive slow reads per path, and monotonic time a skipped path is next tried
+        self._slow_streaks: Dict[str, int] = {}
+        self._skipped_until: Dict[str, float] = {}
+        # command -> (monotonic expiry, output or None)
+        self._run_cache: Dict[Tuple[str, ...], Tuple[float, Optional[str]]] = {}
+        # Previous CPU sample for get_power_draw: (idle, total) /proc/stat
+        # jiffies, or whether psutil has taken its first sample
+        self._prev_cpu_times: Optional[Tuple[int, int]] = None
+        self._cpu_sampled = False
+        # (chip, feature, key) of the temperature in ``sensors -j`` output
+        self._sensors_path: Optional[Tuple[str, str, str]] = None
+
+    def close(self) -> None:
+        """Close the sysfs file descriptors held open between readings."""
+        fds, self._fds = self._fds, {}
+        for fd in fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __del__(self) -> None:
+        if hasattr(self, "_fds"):
+            self.close()
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
-    @staticmethod
-    def _read_file(path: str) -> Optional[str]:
+    @classmethod
+    def _read_file(cls, path: str) -> Optional[str]:
+        # Raw os.read: these files are a few ASCII bytes, so a buffered
+        # text-mode file object is pure overhead
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
         try:
-            with open(path) as fh:
-                return fh.read().strip()
+            return os.read(fd, cls._SYSFS_READ_SIZE).decode(errors="replace").strip()
         except OSError:
             return None
+        finally:
+            os.close(fd)
 
-    @staticmethod
-    def _run(cmd: list) -> Optional[str]:
+    def _read_sysfs(self, path: str) -> Optional[str]:
+        """
+        Read a small sysfs attribute, backing off from paths that are slow to read.
+
+        Some thermal zones take hundreds of milliseconds per read and would
+        stall every monitoring tick. A path whose last _SLOW_READS_BEFORE_SKIP
+        reads each took longer than _SLOW_READ_SECONDS is skipped for
+        _SLOW_PATH_SKIP_SECONDS, then tried again; one stall on a busy system
+        does not count against it once a fast read follows.
+        """
+        skipped_until = self._skipped_until.get(path)
+        if skipped_until is not None:
+            if time.monotonic() < skipped_until:
+                return None
+            del self._skipped_until[path]
+        start = time.perf_counter()
+        value = self._read_cached(path)
+        elapsed = time.perf_counter() - start
+        if elapsed <= self._SLOW_READ_SECONDS:
+            self._slow_streaks.pop(path, None)
+            return value
+        streak = self._slow_streaks.get(path, 0) + 1
+        if streak < self._SLOW_READS_BEFORE_SKIP:
+            self._slow_streaks[path] = streak
+            return value
+        logger.warning(
+            "Reading %s took %.0f ms (%d slow reads in a row); skipping it for %.0fs",
+            path,
+            elapsed * 1000,
+            streak,
+            self._SLOW_PATH_SKIP_SECONDS,
+        )
+        del self._slow_streaks[path]
+        self._skipped_until[path] = time.monotonic() + self._SLOW_PATH_SKIP_SECONDS
+        fd = self._fds.pop(path, None)
+        if fd is not None:
+            os.close(fd)
+        return value
+
+    def _read_cached(self, path: str) -> Optional[str]:
+        """
+        Read a small sysfs attribute through a cached descriptor.
+
+        The file is opened on the first successful read and then re-read with
+        a single pread at offset 0, instead of an open/read/close per call.
+        Paths that fail to open are simply retried next time.
+        """
+        if not hasattr(os, "pread"):
+            return self._read_file(path)
+        fd = self._fds.get(path)
+        try:
+            if fd is None:
+                fd = self._fds[path] = os.open(path, os.O_RDONLY)
+            return os.pread(fd, self._SYSFS_READ_SIZE, 0).decode(errors="replace").strip()
+        except OSError:
+            if fd is not None:
+                del self._fds[path]
+                os.close(fd)
+            return None
+
+    def _run(self, cmd: list) -> Optional[str]:
+        """Run *cmd* and return its stdout, reusing recent results instead of forking again."""
+        key = tuple(cmd)
+        now = time.monotonic()
+        cached = self._run_cache.get(key)
+        if cached is not None and now < cached[0]:
+            return cached[1]
         try:
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            return result.stdout.strip() if result.returncode == 0 else None
+        except FileNotFoundError:
+            out, ttl = None, self._MISSING_COMMAND_CACHE_SECONDS
         except (OSError, subprocess.TimeoutExpired):
-            return None
+            out, ttl = None, self._FAILED_RUN_CACHE_SECONDS
+        else:
+            if result.returncode == 0:
+                out, ttl = result.stdout.strip(), self._RUN_CACHE_SECONDS
+            else:
+                out, ttl = None, self._FAILED_RUN_CACHE_SECONDS
+        self._run_cache[key] = (now + ttl, out)
+        return out
 
     # ------------------------------------------------------------------
     # Public API
@@ -58,7 +193,7 @@ class SystemMonitor:
         """
         # Linux sysfs (value in millidegrees)
         for path in self._TEMP_PATHS:
-            raw = self._read_file(path)
+            raw = self._read_sysfs(path)
             if raw:
                 try:
                     return int(raw) / 1000.0
@@ -67,11 +202,9 @@ class SystemMonitor:
 
         # Raspberry Pi firmware
         out = self._run(["vcgencmd", "measure_temp"])
-        if out and out.startswith("temp="):
-            try:
-                return float(out.split("=")[1].replace("'C", ""))
-            except (IndexError, ValueError):
-                pass
+        match = _TEMP_RE.match(out) if out else None
+        if match:
+            return float(match.group(1))
 
         # lm-sensors fallback (not all systems have it)
         out = self._run(["sensors", "-j"])
@@ -80,17 +213,33 @@ class SystemMonitor:
                 import json
 
                 data = json.loads(out)
-                for chip in data.values():
-                    for feature in chip.values():
-                        if isinstance(feature, dict):
-                            for key, val in feature.items():
-                                if "input" in key and isinstance(val, (int, float)):
-                                    return float(val)
-            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                # Go straight to the reading found last time; rescan only if
+                # the chip layout no longer has it
+                if self._sensors_path is not None:
+                    chip, feature, key = self._sensors_path
+                    val = data.get(chip, {}).get(feature, {}).get(key)
+                    if isinstance(val, (int, float)):
+                        return float(val)
+                self._sensors_path = self._find_sensors_input(data)
+                if self._sensors_path is not None:
+                    chip, feature, key = self._sensors_path
+                    return float(data[chip][feature][key])
+            except (json.JSONDecodeError, AttributeError, KeyError, TypeError, ValueError):
                 pass
 
         return None
 
+    @staticmethod
+    def _find_sensors_input(data: dict) -> Optional[Tuple[str, str, str]]:
+        """Return the (chip, feature, key) path of the first numeric *_input reading in ``sensors -j`` output."""
+        for chip_name, chip in data.items():
+            for feature_name, feature in chip.items():
+                if isinstance(feature, dict):
+                    for key, val in feature.items():
+                        if "input" in key and isinstance(val, (int, float)):
+                            return chip_name, feature_name, key
+        return None
+
     def is_throttled(self) -> bool:
         """
         Return True if the Pi is currently CPU/power throttled.
@@ -100,21 +249,16 @@ class SystemMonitor:
         """
         # vcgencmd (Pi only)
         out = self._run(["vcgencmd", "get_throttled"])
-        if out and out.startswith("throttled="):
-            try:
-                val = int(out.split("=")[1], 16)
-                # Bits 0-3 indicate active throttle conditions
-                return bool(val & 0xF)
-            except (IndexError, ValueError):
-                pass
+        match = _THROTTLE_RE.match(out) if out else None
+        if match:
+            # Bits 0-3 (the last hex digit) indicate active throttle conditions
+            return match.group(1) != "0"
 
         # Sysfs fallback (some Pi kernels expose this)
-        raw = self._read_file(self._THROTTLE_PATH)
-        if raw:
-            try:
-                return bool(int(raw, 16) & 0xF)
-            except ValueError:
-                pass
+        raw = self._read_sysfs(self._THROTTLE_PATH)
+        match = _THROTTLE_SYSFS_RE.fullmatch(raw) if raw else None
+        if match:
+            return match.group(1) != "0"
 
         return False
 
@@ -123,31 +267,22 @@ class SystemMonitor:
         Estimate current power draw in watts.
 
         Returns a rough estimate based on CPU load and known hardware
-        TDP values.  Returns None when estimation is not possible.
+        TDP values.  The load is measured since the previous call, so this
+        never blocks; the first call has nothing to compare against and
+        returns None, as it does when estimation is not possible.
         """
         try:
             import psutil  # optional dependency
-
-            cpu_percent = psutil.cpu_percent(interval=0.5)
         except ImportError:
-            # Fallback: read /proc/stat manually for a single sample
-            stat1 = self._read_file("/proc/stat")
-            if not stat1:
-                return None
-            import time
-
-            time.sleep(0.5)
-            stat2 = self._read_file("/proc/stat")
-            if not stat2:
-                return None
-            try:
-                vals1 = list(map(int, stat1.splitlines()[0].split()[1:]))
-                vals2 = list(map(int, stat2.splitlines()[0].split()[1:]))
-                idle1, idle2 = vals1[3], vals2[3]
-                total1, total2 = sum(vals1), sum(vals2)
-                cpu_percent = (1.0 - (idle2 - idle1) / (total2 - total1)) * 100.0
-            except (ValueError, ZeroDivisionError):
-                return None
+            cpu_percent = self._cpu_percent_from_proc_stat()
+        else:
+            cpu_percent = psutil.cpu_percent(interval=None)
+            # psutil's first non-blocking call has no earlier sample either
+            if not self._cpu_sampled:
+                self._cpu_sampled = True
+                cpu_percent = None
+        if cpu_percent is None:
+            return None
 
         # Simple linear estimate: idle_watts + load_factor * cpu_percent
         # Values are conservative averages for Pi-class hardware.
@@ -155,6 +290,19 @@ class SystemMonitor:
         load_factor = 0.08  # ~10 W at 100% CPU load for Pi 5
         return round(idle_watts + load_factor * cpu_percent, 2)
 
+    def _cpu_percent_from_proc_stat(self) -> Optional[float]:
+        """CPU load since the previous call from /proc/stat jiffies, or None."""
+        try:
+            with open("/proc/stat") as fh:
+                times = list(map(int, fh.readline().split()[1:]))
+            idle, total = times[3], sum(times)
+        except (OSError, ValueError, IndexError):
+            return None
+        prev, self._prev_cpu_times = self._prev_cpu_times, (idle, total)
+        if prev is None or total == prev[1]:
+            return None
+        return (1.0 - (idle - prev[0]) / (total - prev[1])) * 100.0
+
     def get_battery_level(self) -> Optional[int]:
         """
         Return battery capacity as a percentage (0-100), or None.
@@ -163,7 +311,7 @@ class SystemMonitor:
         when no battery or UPS is detected.
         """
         for path in self._BATTERY_PATHS:
-            raw = self._read_file(path)
+            raw = self._read_sysfs(path)
             if raw:
                 try:
                     level = int(raw)
@@ -190,4 +338,7 @@ if __name__ == "__main__":
     import json
 
     monitor = SystemMonitor()
+    # Take the first CPU-load sample so the summary can estimate power draw
+    monitor.get_power_draw()
+    time.sleep(0.5)
     print(json.dumps(monitor.get_summary(), indent=2))